@@ -6,23 +6,51 @@ It serves census tract data, runs simulations, and provides real-time updates.
 """
 
 import os
-import json
 import time
-import threading
+import asyncio
+import gzip
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from flask import Flask, jsonify, request, send_from_directory
-from flask_cors import CORS
+import numpy as np
+import orjson
+from quart import Quart, Response, jsonify, make_response, request, send_from_directory
+from quart_cors import cors
+from flask_orjson import OrjsonProvider
+
+try:
+    import ormsgpack
+except ImportError:  # msgpack responses are optional; clients then always get JSON
+    ormsgpack = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; compressed responses then always use gzip
+    zstandard = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; census totals then fall back to NumPy sums
+    njit = None
 
 from sim.core.entities import load_graph
 from sim.core.simulation import Simulation
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend integration
+# Quart keeps the Flask routing API but runs handlers on an asyncio event loop,
+# so many pollers are served by one loop instead of a thread per request.
+app = Quart(__name__)
+app = cors(app)  # Enable CORS for frontend integration
+
+# Serialize responses with orjson; numpy scalars/arrays from the simulation
+# and non-string dict keys are handled natively without a Python `default` hook
+app.json = OrjsonProvider(app)
+app.json.option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
 
 # Global variables for simulation state
 current_simulation: Optional[Simulation] = None
-simulation_thread: Optional[threading.Thread] = None
+simulation_task: Optional[asyncio.Task] = None
 simulation_running = False
 simulation_data = {}
 simulation_speed_multiplier = 1.0  # Default 1x speed (1 second per day)
@@ -31,12 +59,30 @@ simulation_speed_multiplier = 1.0  # Default 1x speed (1 second per day)
 NODES_CSV = "tract_nodes.csv"
 NEIGHBORS_JSON = "tract_neighbors.json"
 GRAPH_JSON = "us_census_graph.json"
+SNAPSHOT_DIR = "census_snapshot"  # Binary copy of GRAPH_JSON written by build_snapshot.py
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+
+# Per-tract fields that the simulation updates or that hot endpoints read are
+# stored column-wise (one NumPy array per field, row = geoid_index[geoid]);
+# census_data keeps only the remaining static fields of each record.
+CENSUS_COLUMNS = {
+    "population": np.int32,
+    "susceptible_pop": np.int32,
+    "infectious_pop": np.int32,
+    "recovered_pop": np.int32,
+    "deceased_pop": np.int32,
+    "lon": np.float64,
+    "lat": np.float64,
+    "is_quarantined": np.bool_,
+}
 
 def load_census_data():
     """Load census tract data from JSON file."""
     try:
-        with open(GRAPH_JSON, 'r') as f:
-            return json.load(f)
+        with open(GRAPH_JSON, 'rb') as f:
+            return orjson.loads(f.read())
     except FileNotFoundError:
         print(f"Census data file {GRAPH_JSON} not found. Please run the data loading script first.")
         return {}
@@ -44,64 +90,356 @@ def load_census_data():
         print(f"Error loading census data: {e}")
         return {}
 
-# Load census data on startup
-census_data = load_census_data()
-print(f"Loaded {len(census_data)} census tracts")
+def load_census_snapshot():
+    """
+    Load the census columns from the binary snapshot, if one has been built.
+    Arrays are memory-mapped copy-on-write (exposed as plain ndarray views), so
+    startup parses nothing and unmodified pages are shared between processes.
+    Returns (geoids, columns) or None.
+    """
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return None
+    try:
+        geoids = np.load(os.path.join(SNAPSHOT_DIR, "geoids.npy")).tolist()
+        columns = {
+            key: np.asarray(np.load(os.path.join(SNAPSHOT_DIR, f"{key}.npy"), mmap_mode='c'))
+            for key in CENSUS_COLUMNS
+        }
+        return geoids, columns
+    except Exception as e:
+        print(f"Error loading census snapshot: {e}")
+        return None
+
+def load_snapshot_records() -> Dict[str, Dict]:
+    """Load the static (non-column) fields of every tract from the snapshot."""
+    with open(os.path.join(SNAPSHOT_DIR, "records.json"), 'rb') as f:
+        return orjson.loads(f.read())
+
+def load_census():
+    """
+    Load census data, preferring the binary snapshot over GRAPH_JSON.
+    Returns (static records, geoids, geoid_index, columns); the static records
+    are None when loaded from the snapshot, and parsed on first use instead.
+    """
+    snapshot = load_census_snapshot()
+    if snapshot is not None:
+        geoids, columns = snapshot
+        return None, geoids, {geoid: i for i, geoid in enumerate(geoids)}, columns
+    data = load_census_data()
+    geoids, geoid_index, columns = build_census_columns(data)
+    return data, geoids, geoid_index, columns
+
+def build_census_columns(data: Dict[str, Dict]):
+    """
+    Split parsed census records into column arrays.
+    Column fields are popped from each record, leaving only static fields behind.
+    Returns (geoids, geoid_index, columns).
+    """
+    geoids = list(data)
+    n = len(geoids)
+    records = list(data.values())
+    columns = {
+        key: np.fromiter((record.pop(key, 0) for record in records), dtype=dtype, count=n)
+        for key, dtype in CENSUS_COLUMNS.items()
+    }
+    geoid_index = {geoid: i for i, geoid in enumerate(geoids)}
+    return geoids, geoid_index, columns
+
+if njit is not None:
+    @njit(cache=True)
+    def _census_totals(population, susceptible, infectious, recovered, deceased, quarantined):
+        """Sum all six census columns in one fused pass."""
+        totals = np.zeros(6, np.int64)
+        for i in range(population.shape[0]):
+            totals[0] += population[i]
+            totals[1] += susceptible[i]
+            totals[2] += infectious[i]
+            totals[3] += recovered[i]
+            totals[4] += deceased[i]
+            if quarantined[i]:
+                totals[5] += 1
+        return totals
+else:
+    def _census_totals(population, susceptible, infectious, recovered, deceased, quarantined):
+        """Sum all six census columns, one NumPy reduction each."""
+        return np.array([population.sum(), susceptible.sum(), infectious.sum(),
+                         recovered.sum(), deceased.sum(), np.count_nonzero(quarantined)], dtype=np.int64)
+
+def compute_census_totals(columns: Dict[str, np.ndarray]) -> Dict[str, int]:
+    """Sum the census compartments once so /api/statistics need not rescan them."""
+    totals = _census_totals(
+        columns["population"], columns["susceptible_pop"], columns["infectious_pop"],
+        columns["recovered_pop"], columns["deceased_pop"], columns["is_quarantined"],
+    ).tolist()
+    return dict(zip(("population", "susceptible", "infectious", "recovered", "deceased", "quarantined_areas"), totals))
+
+def census_static_records() -> Dict[str, Dict]:
+    """Static fields of every tract, loading them from the snapshot on first use."""
+    global census_data
+    if census_data is None:
+        census_data = load_snapshot_records()
+    return census_data
+
+def census_record(geoid: str) -> Dict:
+    """Reassemble the full JSON record for one tract from the current snapshot."""
+    state = census_state
+    i = state.geoid_index[geoid]
+    record = dict(census_static_records()[geoid])
+    for key, column in state.columns.items():
+        record[key] = column[i].item()
+    return record
+
+def census_records(state: "CensusState", limit: Optional[int] = None) -> Dict[str, Dict]:
+    """Reassemble full JSON records for the first `limit` tracts of a snapshot (all if None)."""
+    geoids = state.geoids[:limit]
+    values = {key: column[:len(geoids)].tolist() for key, column in state.columns.items()}
+    static_records = census_static_records()
+    records = {}
+    for i, geoid in enumerate(geoids):
+        record = dict(static_records[geoid])
+        for key, column in values.items():
+            record[key] = column[i]
+        records[geoid] = record
+    return records
+
+# Census columns that mirror simulation state, mapped to the Simulation array names
+SIMULATION_COLUMNS = {
+    "susceptible_pop": "S",
+    "infectious_pop": "I",
+    "recovered_pop": "R",
+    "deceased_pop": "D",
+    "is_quarantined": "quarantined",
+}
+
+# (census_rows, simulation_rows) when census and simulation tract order differ
+_census_link = None
+
+# Load census data on startup; census_columns are the live (writable) columns,
+# which readers only see through the published CensusState snapshots below
+census_data, census_geoids, geoid_index, census_columns = load_census()
+_baseline_totals = compute_census_totals(census_columns)
+print(f"Loaded {len(census_geoids)} census tracts")
+
+@dataclass(frozen=True, eq=False)
+class CensusState:
+    """
+    Read-only snapshot of the census columns at one version.
+    The simulation side publishes by rebinding census_state to a new snapshot;
+    handlers read that reference once and then see consistent arrays without
+    locking, even while the next step runs. Hashed by identity, so a snapshot
+    can key the serialization caches below.
+    """
+    version: int
+    geoids: List[str]
+    geoid_index: Dict[str, int]
+    columns: Dict[str, np.ndarray]
+
+def snapshot_census(version: int) -> CensusState:
+    """Copy the live census columns into a read-only CensusState."""
+    columns = {}
+    for key, column in census_columns.items():
+        column = column.copy()
+        column.flags.writeable = False
+        columns[key] = column
+    return CensusState(version, census_geoids, geoid_index, columns)
+
+# The version doubles as the ETag so unchanged polls can be answered with 304.
+# Recent snapshots are kept so clients can ask for the changes since one they hold.
+RECENT_STATES = 16
+census_state = snapshot_census(0)
+_recent_states = deque([census_state], maxlen=RECENT_STATES)
+
+# Set (and replaced) whenever census data or run status changes, waking /stream subscribers
+_state_changed = asyncio.Event()
+
+def publish_census_update():
+    """Publish a new census snapshot after the live census columns have been modified."""
+    global census_state
+    census_state = snapshot_census(census_state.version + 1)
+    _recent_states.append(census_state)
+    notify_state_subscribers()
+
+def notify_state_subscribers():
+    """Wake every stream subscriber waiting on the current event and arm a fresh one."""
+    global _state_changed
+    _state_changed.set()
+    _state_changed = asyncio.Event()
+
+def diff_base(version: Optional[int], state: CensusState) -> Optional[CensusState]:
+    """The recent snapshot at `version` if `state` can be sent as a diff against it, else None."""
+    for base in _recent_states:
+        if base.version == version:
+            # A reset replaces the tract list, after which only a full state makes sense
+            return base if base.geoids is state.geoids else None
+    return None
+
+@lru_cache(maxsize=1)
+def census_json(state: CensusState) -> bytes:
+    """Serialized /api/census-data body for a snapshot, built once per version."""
+    return orjson.dumps(census_records(state), option=app.json.option)
+
+def tile_columns(state: CensusState, rows=slice(None)) -> Dict[str, Any]:
+    """
+    Tile data for the given rows (a slice or an index array) as parallel columns
+    (one list/array per field), which orjson serializes straight from the NumPy buffers.
+    """
+    columns = state.columns
+    if isinstance(rows, slice):
+        geoids = state.geoids[rows]
+    else:
+        geoids = [state.geoids[i] for i in rows.tolist()]
+    return {
+        "geoid": geoids,
+        "total_population": columns["population"][rows],
+        "amount_infected": columns["infectious_pop"][rows],
+        "amount_deceased": columns["deceased_pop"][rows],
+        "coordinates": np.column_stack((columns["lon"][rows], columns["lat"][rows])),
+    }
+
+def changed_tile_rows(base: CensusState, state: CensusState) -> np.ndarray:
+    """Rows whose tile values differ between two snapshots of the same tract list."""
+    changed = base.columns["infectious_pop"] != state.columns["infectious_pop"]
+    changed |= base.columns["deceased_pop"] != state.columns["deceased_pop"]
+    return np.flatnonzero(changed)
+
+def encode(data: Any, mimetype: str) -> bytes:
+    """Serialize a response body as JSON or msgpack."""
+    if mimetype == MSGPACK_MIMETYPE:
+        return ormsgpack.packb(data, option=ormsgpack.OPT_SERIALIZE_NUMPY)
+    return orjson.dumps(data, option=app.json.option)
+
+@lru_cache(maxsize=16)
+def tiles_body(state: CensusState, limit: Optional[int], base: Optional[CensusState], mimetype: str) -> bytes:
+    """
+    Serialized tile columns for the first `limit` tracts of a snapshot (all if None),
+    or, given a `base` snapshot, only for the tracts that changed since it.
+    msgpack packs the integer columns as binary rather than digits.
+    """
+    rows = slice(limit) if base is None else changed_tile_rows(base, state)
+    return encode(tile_columns(state, rows), mimetype)
+
+def state_body(simulation_id: str, status: str, state: CensusState,
+               base: Optional[CensusState] = None, mimetype: str = JSON_MIMETYPE) -> bytes:
+    """
+    Serialized simulation state. With a `base` snapshot, "tiles" only lists the
+    tracts that changed since it and "since" names its version (null otherwise).
+    The cached tile bytes are spliced into the header map as-is.
+    """
+    header = {
+        "id": simulation_id,
+        "status": status,
+        "version": state.version,
+        "since": base.version if base is not None else None,
+    }
+    tiles = tiles_body(state, None, base, mimetype)
+    if mimetype == MSGPACK_MIMETYPE:
+        # Re-emit the fixmap header with one more entry, then append the tiles pair
+        return b"".join((bytes([0x80 | (len(header) + 1)]), ormsgpack.packb(header)[1:],
+                         ormsgpack.packb("tiles"), tiles))
+    return b"".join((orjson.dumps(header)[:-1], b',"tiles":', tiles, b"}"))
+
+# In-flight body builds, so concurrent requests for the same body share one serialization
+_pending_builds: Dict[tuple, asyncio.Future] = {}
+
+async def build_once(build, *args) -> bytes:
+    """
+    Run build(*args) in a worker thread, or join a build of the same call that
+    is already running; every caller wakes with the same bytes.
+    """
+    key = (build, *args)
+    future = _pending_builds.get(key)
+    if future is None:
+        future = asyncio.ensure_future(asyncio.to_thread(build, *args))
+        _pending_builds[key] = future
+        future.add_done_callback(lambda _: _pending_builds.pop(key, None))
+    # One caller disconnecting must not cancel the build for the others
+    return await asyncio.shield(future)
+
+def wants_msgpack() -> bool:
+    """True if the client prefers msgpack over JSON and msgpack support is installed."""
+    if ormsgpack is None:
+        return False
+    return request.accept_mimetypes.best_match([JSON_MIMETYPE, MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE
+
+def accepted_encoding() -> Optional[str]:
+    """The preferred Content-Encoding the client accepts among those we produce, or None."""
+    offers = ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+    return request.accept_encodings.best_match(offers)
+
+@lru_cache(maxsize=16)
+def compressed_body(encoding: str, build, *args) -> bytes:
+    """build(*args) compressed with `encoding`, so each variant is compressed only once."""
+    body = build(*args)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return gzip.compress(body, compresslevel=6)
+
+async def cached_response(etag: str, build, *args, mimetype: str = JSON_MIMETYPE) -> Response:
+    """
+    Serve the body produced by build(*args), or 304 if the client already holds
+    this ETag. The body is compressed when the client accepts gzip or zstd;
+    the encoding is part of the ETag, and each variant is built once and cached.
+    """
+    encoding = accepted_encoding()
+    if encoding is not None:
+        etag = f"{etag}-{encoding}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    elif encoding is None:
+        response = Response(await build_once(build, *args), mimetype=mimetype)
+    else:
+        response = Response(await build_once(compressed_body, encoding, build, *args), mimetype=mimetype)
+        response.content_encoding = encoding
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    # Clients may keep the body but must revalidate it (cheaply, via the ETag) before reuse
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/api/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint."""
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "census_tracts_loaded": len(census_data)
+        "census_tracts_loaded": len(census_geoids)
     })
 
 @app.route('/api/census-data', methods=['GET'])
-def get_census_data():
+async def get_census_data():
     """Get census tract data."""
     # Optionally limit the number of tracts for performance
     limit = request.args.get('limit', type=int)
     
+    state = census_state
     if limit:
-        limited_data = dict(list(census_data.items())[:limit])
-        return jsonify(limited_data)
+        return jsonify(census_records(state, limit))
     
-    return jsonify(census_data)
+    return await cached_response(str(state.version), census_json, state)
 
 @app.route('/api/census-data/<geoid>', methods=['GET'])
-def get_census_tract(geoid: str):
+async def get_census_tract(geoid: str):
     """Get data for a specific census tract."""
-    if geoid not in census_data:
+    if geoid not in census_state.geoid_index:
         return jsonify({"error": "Census tract not found"}), 404
     
-    return jsonify(census_data[geoid])
+    return jsonify(census_record(geoid))
 
 @app.route('/api/tiles', methods=['GET'])
-def get_tiles():
+async def get_tiles():
     """Get tile data for the frontend (legacy endpoint)."""
-    # Convert census data to tile format for compatibility
-    tiles = []
-    
     # Use a subset for performance
-    for geoid, node in list(census_data.items())[:1000]:
-        tiles.append({
-            "geoid": geoid,
-            "total_population": node["population"],
-            "amount_infected": node["infectious_pop"],
-            "amount_deceased": node["deceased_pop"],
-            "coordinates": [node["lon"], node["lat"]]
-        })
-    
-    return jsonify(tiles)
+    limit = request.args.get('limit', type=int) or 1000
+    state = census_state
+    return await cached_response(f"{state.version}-{limit}", tiles_body, state, limit, None, JSON_MIMETYPE)
 
 @app.route('/api/simulation/start', methods=['POST'])
-def start_simulation():
+async def start_simulation():
     """Start a new pandemic simulation."""
-    global current_simulation, simulation_thread, simulation_running
+    global current_simulation, simulation_task, simulation_running
     
     try:
-        data = request.get_json()
+        data = await request.get_json()
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
             
@@ -114,12 +452,11 @@ def start_simulation():
         # Stop existing simulation if running
         if simulation_running:
             simulation_running = False
-            if simulation_thread and simulation_thread.is_alive():
-                simulation_thread.join(timeout=1)
+            await stop_simulation_task()
         
         # Load nodes for simulation
         print("Loading graph data...")
-        nodes = load_graph(NODES_CSV, NEIGHBORS_JSON)
+        nodes = await asyncio.to_thread(load_graph, NODES_CSV, NEIGHBORS_JSON)
         if not nodes:
             return jsonify({"error": "Failed to load simulation data - no nodes loaded"}), 500
             
@@ -132,6 +469,7 @@ def start_simulation():
             recovery_rate=params.get('recovery_rate', 0.03),
             mortality_rate=params.get('mortality_rate', 0.005)
         )
+        link_census_to_simulation(current_simulation)
         
         # Seed infection at specific location or randomly
         if initial_infected_tile and initial_infected_tile in nodes:
@@ -143,10 +481,9 @@ def start_simulation():
             current_simulation.seed_infection(num_nodes=5)
             print("Seeded infection randomly at 5 nodes")
         
-        # Start simulation in background thread for real-time updates
+        # Start simulation as a background task on the event loop for real-time updates
         simulation_running = True
-        simulation_thread = threading.Thread(target=run_simulation_background)
-        simulation_thread.start()
+        simulation_task = asyncio.create_task(run_simulation_loop())
         
         simulation_id = f"sim_{int(time.time())}"
         
@@ -170,18 +507,12 @@ def seed_infection_at_specific_node(node_id: str, initial_infected: int = 10):
     if current_simulation and node_id in current_simulation.nodes:
         node = current_simulation.nodes[node_id]
         if node.susceptible_pop > 0:
-            actual_infected = min(initial_infected, node.susceptible_pop)
-            node.susceptible_pop -= actual_infected
-            node.infectious_pop += actual_infected
+            actual_infected = current_simulation.seed_infection_at(node_id, initial_infected)
             print(f"Seeded {actual_infected} infections in node {node_id} (population: {node.population})")
             
-            # IMMEDIATELY update census_data so frontend sees the change
-            if node_id in census_data:
-                census_data[node_id]["susceptible_pop"] = node.susceptible_pop
-                census_data[node_id]["infectious_pop"] = node.infectious_pop
-                census_data[node_id]["recovered_pop"] = node.recovered_pop
-                census_data[node_id]["deceased_pop"] = node.deceased_pop
-                print(f"Updated census_data for {node_id}: infectious={node.infectious_pop}")
+            # IMMEDIATELY publish the change so frontend sees it
+            sync_census_data(current_simulation)
+            print(f"Updated census_data for {node_id}: infectious={node.infectious_pop}")
         else:
             print(f"Warning: Node {node_id} has no susceptible population")
     else:
@@ -192,14 +523,16 @@ def get_current_simulation_stats():
     if not current_simulation:
         return {}
         
-    total_population = sum(node.population for node in current_simulation.nodes.values())
-    total_susceptible = sum(node.susceptible_pop for node in current_simulation.nodes.values())
-    total_infectious = sum(node.infectious_pop for node in current_simulation.nodes.values())
-    total_recovered = sum(node.recovered_pop for node in current_simulation.nodes.values())
-    total_deceased = sum(node.deceased_pop for node in current_simulation.nodes.values())
+    # Totals are maintained incrementally by the simulation, so this is O(1)
+    totals = current_simulation.totals
+    total_population = totals["population"]
+    total_susceptible = totals["susceptible"]
+    total_infectious = totals["infectious"]
+    total_recovered = totals["recovered"]
+    total_deceased = totals["deceased"]
     
     # Count infected areas (nodes with any infections)
-    infected_areas = sum(1 for node in current_simulation.nodes.values() if node.infectious_pop > 0)
+    infected_areas = totals["infected_nodes"]
     
     # Calculate rates
     infection_rate = (total_infectious / total_population * 100) if total_population > 0 else 0
@@ -217,58 +550,100 @@ def get_current_simulation_stats():
         "infection_rate": round(infection_rate, 4),
         "mortality_rate": round(mortality_rate, 4),
         "recovery_rate": round(recovery_rate, 4),
-        "daily_new_infections": getattr(current_simulation, 'daily_new_infections', 0)
+        "daily_new_infections": current_simulation.daily_new_infections
     }
 
-def run_simulation_background():
+def link_census_to_simulation(simulation: Simulation):
+    """
+    Back the live census compartment columns with the simulation's own state
+    arrays, so publishing needs no write-back first. If the census and the
+    simulation list tracts in a different order, remember a row mapping instead
+    and let sync_census_data gather through it.
+    """
+    global _census_link
+    
+    if census_geoids == simulation.node_ids:
+        for key, attr in SIMULATION_COLUMNS.items():
+            census_columns[key] = getattr(simulation, attr)
+        _census_link = None
+    else:
+        pairs = np.array([(row, simulation.geoid_to_idx[geoid]) for row, geoid in enumerate(census_geoids)
+                          if geoid in simulation.geoid_to_idx], dtype=np.intp).reshape(-1, 2)
+        _census_link = (pairs[:, 0], pairs[:, 1])
+    sync_census_data(simulation)
+
+def sync_census_data(simulation: Simulation):
+    """Publish the simulation's latest state to census readers."""
+    if _census_link is not None:
+        census_rows, sim_rows = _census_link
+        for key, attr in SIMULATION_COLUMNS.items():
+            census_columns[key][census_rows] = getattr(simulation, attr)[sim_rows]
+    publish_census_update()
+
+async def run_simulation_loop():
     """Run complete simulation with periodic updates."""
     global simulation_running, census_data, simulation_speed_multiplier
     
     max_steps = 1000  # Maximum simulation steps
     update_interval = 2  # Update frontend every 2 steps
     step_count = 0
+    simulation = current_simulation
     
     try:
-        while simulation_running and current_simulation and step_count < max_steps:
-            # Run one simulation step
-            current_simulation.step()
+        while simulation_running and simulation is current_simulation and step_count < max_steps:
+            # Run one simulation step off the event loop so HTTP handlers keep being served
+            await asyncio.to_thread(simulation.step)
             step_count += 1
             
             # Add delay after every step to control simulation speed
             base_delay = 1.0  # 1 second base delay per simulation step
             actual_delay = base_delay / simulation_speed_multiplier
-            time.sleep(actual_delay)
+            await asyncio.sleep(actual_delay)
             
             # Update census data periodically for frontend visualization
             if step_count % update_interval == 0:
-                for geoid, node in current_simulation.nodes.items():
-                    if geoid in census_data:
-                        census_data[geoid]["susceptible_pop"] = node.susceptible_pop
-                        census_data[geoid]["infectious_pop"] = node.infectious_pop
-                        census_data[geoid]["recovered_pop"] = node.recovered_pop
-                        census_data[geoid]["deceased_pop"] = node.deceased_pop
-                        census_data[geoid]["is_quarantined"] = node.is_quarantined
+                sync_census_data(simulation)
+
             
             # Check if simulation has naturally ended (no more infections)
-            total_infectious = sum(node.infectious_pop for node in current_simulation.nodes.values())
+            total_infectious = simulation.totals["infectious"]
             if total_infectious == 0:
                 print(f"Simulation ended naturally at step {step_count} - no more infections")
                 break
                 
         # Simulation completed or ended
         print(f"Simulation finished after {step_count} steps")
-        simulation_running = False
+        if simulation is current_simulation:
+            simulation_running = False
+            notify_state_subscribers()
         
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
         print(f"Simulation error: {e}")
-        simulation_running = False
+        if simulation is current_simulation:
+            simulation_running = False
+            notify_state_subscribers()
+
+async def stop_simulation_task():
+    """Cancel the background simulation task and wait briefly for it to exit."""
+    global simulation_task
+    
+    if simulation_task and not simulation_task.done():
+        simulation_task.cancel()
+        try:
+            await asyncio.wait_for(simulation_task, timeout=1.0)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            pass
+    simulation_task = None
 
 @app.route('/api/simulation/<simulation_id>/stop', methods=['POST'])
-def stop_simulation(simulation_id: str):
+async def stop_simulation(simulation_id: str):
     """Stop a running simulation."""
     global simulation_running
     
     simulation_running = False
+    notify_state_subscribers()
     
     return jsonify({
         "id": simulation_id,
@@ -277,37 +652,70 @@ def stop_simulation(simulation_id: str):
     })
 
 @app.route('/api/simulation/<simulation_id>/state', methods=['GET'])
-def get_simulation_state(simulation_id: str):
-    """Get current simulation state."""
-    tiles = []
-    infected_count = 0
+async def get_simulation_state(simulation_id: str):
+    """
+    Get current simulation state.
+    Pass ?since=<version> (the "version" of a previous response) to receive only
+    the tiles that changed since then; a full state is returned if that version
+    is no longer available.
+    """
+    state = census_state
+    status = "running" if simulation_running else "stopped"
+    base = diff_base(request.args.get('since', type=int), state)
+    mimetype = MSGPACK_MIMETYPE if wants_msgpack() else JSON_MIMETYPE
     
-    # Convert current census data to tile format - check all tracts for infections
-    for geoid, node in census_data.items():
-        if node["infectious_pop"] > 0:
-            infected_count += 1
-            print(f"Found infected tract: {geoid} with {node['infectious_pop']} infections")
-            
-        tiles.append({
-            "geoid": geoid,
-            "total_population": node["population"],
-            "amount_infected": node["infectious_pop"],
-            "amount_deceased": node["deceased_pop"],
-            "coordinates": [node["lon"], node["lat"]]
-        })
+    # Tiles only change when census_data is republished; include the run status
+    # in the tag so a finished simulation is still reported to pollers.
+    # The diff base and the format (chosen via the Accept header) are part of the tag too.
+    etag = f"{state.version}-{status}"
+    if base is not None:
+        etag += f"-since{base.version}"
+    if mimetype == MSGPACK_MIMETYPE:
+        etag += "-msgpack"
     
-    print(f"Returning {len(tiles)} tiles, {infected_count} infected")
+    app.logger.debug("Returning tiles for simulation %s at version %d", simulation_id, state.version)
+    response = await cached_response(etag, state_body, simulation_id, status, state, base, mimetype,
+                                     mimetype=mimetype)
+    response.vary.add("Accept")
+    return response
+
+@app.route('/api/simulation/<simulation_id>/stream', methods=['GET'])
+async def stream_simulation_state(simulation_id: str):
+    """
+    Push the simulation state as Server-Sent Events instead of being polled.
+    The full state is sent immediately; after every census update or status
+    change the next event only carries the tiles that changed since the last
+    one sent. The stream ends once the simulation is no longer running.
+    """
+    async def events():
+        sent = None  # This client's cursor: the snapshot it last received
+        while True:
+            # Take the event before serializing so an update landing meanwhile is not missed
+            changed = _state_changed
+            state = census_state
+            running = simulation_running
+            base = sent if sent is not None and sent.geoids is state.geoids else None
+            status = "running" if running else "stopped"
+            body = await build_once(state_body, simulation_id, status, state, base, JSON_MIMETYPE)
+            yield b"data: " + body + b"\n\n"
+            sent = state
+            if not running:
+                break
+            await changed.wait()
     
-    return jsonify({
-        "id": simulation_id,
-        "status": "running" if simulation_running else "stopped",
-        "tiles": tiles
+    response = await make_response(events(), {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
     })
+    response.timeout = None  # Keep the stream open for the whole run
+    return response
 
 @app.route('/api/simulation/<simulation_id>/reset', methods=['POST'])
-def reset_simulation(simulation_id: str):
+async def reset_simulation(simulation_id: str):
     """Reset simulation to initial state."""
-    global simulation_running, census_data, current_simulation, simulation_thread
+    global simulation_running, census_data, current_simulation, _baseline_totals
+    global census_geoids, geoid_index, census_columns, _census_link
     
     # Stop simulation
     simulation_running = False
@@ -315,13 +723,14 @@ def reset_simulation(simulation_id: str):
     # Clear current simulation
     current_simulation = None
     
-    # Wait for thread to finish if it's running
-    if simulation_thread and simulation_thread.is_alive():
-        simulation_thread.join(timeout=1.0)
-    simulation_thread = None
+    # Wait for the background task to finish if it's running
+    await stop_simulation_task()
     
     # Reload initial census data
-    census_data = load_census_data()
+    census_data, census_geoids, geoid_index, census_columns = await asyncio.to_thread(load_census)
+    _census_link = None
+    _baseline_totals = compute_census_totals(census_columns)
+    publish_census_update()
     
     print(f"Simulation {simulation_id} reset to initial state")
     
@@ -332,20 +741,20 @@ def reset_simulation(simulation_id: str):
     })
 
 @app.route('/api/statistics', methods=['GET'])
-def get_statistics():
+async def get_statistics():
     """Get overall simulation statistics."""
     if current_simulation:
         # Use current simulation data for real-time stats
         stats = get_current_simulation_stats()
         return jsonify(stats)
     else:
-        # Use census data if no simulation is running
-        total_population = sum(node.get("population", 0) for node in census_data.values())
-        total_susceptible = sum(node.get("susceptible_pop", 0) for node in census_data.values())
-        total_infectious = sum(node.get("infectious_pop", 0) for node in census_data.values())
-        total_recovered = sum(node.get("recovered_pop", 0) for node in census_data.values())
-        total_deceased = sum(node.get("deceased_pop", 0) for node in census_data.values())
-        quarantined_areas = sum(1 for node in census_data.values() if node.get("is_quarantined", False))
+        # Use census data if no simulation is running (totals cached at load)
+        total_population = _baseline_totals["population"]
+        total_susceptible = _baseline_totals["susceptible"]
+        total_infectious = _baseline_totals["infectious"]
+        total_recovered = _baseline_totals["recovered"]
+        total_deceased = _baseline_totals["deceased"]
+        quarantined_areas = _baseline_totals["quarantined_areas"]
         
         return jsonify({
             "day": 0,
@@ -356,16 +765,16 @@ def get_statistics():
             "deceased": total_deceased,
             "infected_areas": quarantined_areas,
             "infection_rate": (total_infectious / total_population * 100) if total_population > 0 else 0,
-            "total_tracts": len(census_data)
+            "total_tracts": len(census_geoids)
         })
 
 @app.route('/api/simulation/speed', methods=['POST'])
-def set_simulation_speed():
+async def set_simulation_speed():
     """Set simulation speed multiplier."""
     global simulation_speed_multiplier
     
     try:
-        data = request.get_json()
+        data = await request.get_json()
         if not data or 'speed' not in data:
             return jsonify({"error": "Speed multiplier required"}), 400
             
@@ -386,18 +795,25 @@ def set_simulation_speed():
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/api/simulation/speed', methods=['GET'])
-def get_simulation_speed():
+async def get_simulation_speed():
     """Get current simulation speed multiplier."""
     return jsonify({"speed": simulation_speed_multiplier})
 
 if __name__ == '__main__':
     print("Starting Cura Pandemic Simulation API Server...")
-    print(f"Loaded {len(census_data)} census tracts")
+    print(f"Loaded {len(census_geoids)} census tracts")
     print("Server starting on http://localhost:8001")
     
-    app.run(
+    # Serve through Uvicorn (uvloop event loop, httptools parser) rather than
+    # the development server. Pass the app object, not "api_server:app", so the
+    # census file is not parsed again by a second import, and keep one worker
+    # so a single process owns the simulation state.
+    import uvicorn
+    uvicorn.run(
+        app,
         host='0.0.0.0',
         port=8001,
-        debug=True,
-        threaded=True
-    )
\ No newline at end of file
+        loop='uvloop',
+        http='httptools',
+        workers=1
+    )
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Build a binary snapshot of us_census_graph.json for fast API server startup.
+
+The per-tract columns the API server keeps in NumPy arrays are written as one
+.npy file each, so the server can memory-map them instead of parsing JSON.
+The remaining static fields of each tract go to records.json, which the
+server only parses when full records are requested.
+"""
+
+import os
+import orjson
+import numpy as np
+
+GRAPH_JSON = "us_census_graph.json"
+SNAPSHOT_DIR = "census_snapshot"
+
+# Must match CENSUS_COLUMNS in api_server.py
+CENSUS_COLUMNS = {
+    "population": np.int32,
+    "susceptible_pop": np.int32,
+    "infectious_pop": np.int32,
+    "recovered_pop": np.int32,
+    "deceased_pop": np.int32,
+    "lon": np.float64,
+    "lat": np.float64,
+    "is_quarantined": np.bool_,
+}
+
+def build_snapshot():
+    """Convert the census graph JSON into the snapshot directory."""
+    if not os.path.exists(GRAPH_JSON):
+        print(f"Census data file {GRAPH_JSON} not found. Please run the data loading script first.")
+        return None
+    
+    print(f"Loading {GRAPH_JSON}...")
+    with open(GRAPH_JSON, 'rb') as f:
+        data = orjson.loads(f.read())
+    
+    geoids = list(data)
+    records = list(data.values())
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    
+    np.save(os.path.join(SNAPSHOT_DIR, "geoids.npy"), np.array(geoids, dtype=str))
+    for key, dtype in CENSUS_COLUMNS.items():
+        # Popping leaves only the static fields in each record
+        column = np.fromiter((record.pop(key, 0) for record in records), dtype=dtype, count=len(records))
+        np.save(os.path.join(SNAPSHOT_DIR, f"{key}.npy"), column)
+    
+    with open(os.path.join(SNAPSHOT_DIR, "records.json"), 'wb') as f:
+        f.write(orjson.dumps(data))
+    
+    print(f"Wrote snapshot of {len(geoids)} census tracts to {SNAPSHOT_DIR}/")
+    return SNAPSHOT_DIR
+
+if __name__ == "__main__":
+    build_snapshot()
@@ -1,6 +1,6 @@
 import React, { useEffect, useRef, useState } from 'react';
 import mapboxgl from 'mapbox-gl';
-import { apiService, SimulationStatistics } from '../../services/apiService';
+import { apiService, SimulationStatistics, TileColumns } from '../../services/apiService';
 
 // Types for our simulation data
 export interface TileData {
@@ -56,6 +56,10 @@ interface SimulationPageProps {
 export const SimulationPage: React.FC<SimulationPageProps> = ({ onBackToLanding }) => {
   const mapContainer = useRef<HTMLDivElement>(null);
   const map = useRef<mapboxgl.Map | null>(null);
+  const eventSource = useRef<EventSource | null>(null);
+  // Latest census data, so streamed tile diffs are merged onto the newest state
+  // rather than the one captured when the stream was opened
+  const latestCensusData = useRef<Record<string, CensusTractNode>>({});
   const [isMapLoaded, setIsMapLoaded] = useState(false);
   const [selectedTile, setSelectedTile] = useState<string | null>(null);
   const [selectedTileData, setSelectedTileData] = useState<CensusTractNode | null>(null);
@@ -84,7 +88,6 @@ export const SimulationPage: React.FC<SimulationPageProps> = ({ onBackToLanding
   const [hasSimulationStarted, setHasSimulationStarted] = useState(false);
   const [isLoadingData, setIsLoadingData] = useState(true);
   const [simulationId, setSimulationId] = useState<string | null>(null);
-  const [pollingInterval, setPollingInterval] = useState<number | null>(null);
   const [statistics, setStatistics] = useState<SimulationStatistics | null>(null);
   const [initialInfectionNode, setInitialInfectionNode] = useState<string | null>(null);
   const [simulationSpeed, setSimulationSpeed] = useState(1.0); // Default 1x speed
@@ -302,6 +305,10 @@ export const SimulationPage: React.FC<SimulationPageProps> = ({ onBackToLanding
     }
   }, [currentZoom, allCensusData]);
 
+  useEffect(() => {
+    latestCensusData.current = allCensusData;
+  }, [allCensusData]);
+
   // Add census data layers when data is loaded
   useEffect(() => {
     if (isMapLoaded && Object.keys(censusData).length > 0) {
@@ -644,94 +651,93 @@ export const SimulationPage: React.FC<SimulationPageProps> = ({ onBackToLanding
     }
   };
 
-  // Polling functions for real-time simulation updates
+  // Real-time simulation updates: the server pushes a state event after every update
   const startPollingSimulationData = (simId: string) => {
     setSimulationId(simId);
     
-    // Clear any existing polling
-    if (pollingInterval) {
-      clearInterval(pollingInterval);
-    }
+    // Close any existing stream
+    stopPolling();
     
-    // Start new polling every 500ms since backend updates every 10 steps
-    const interval = setInterval(async () => {
-      await fetchSimulationUpdate(simId);
-    }, 500) as unknown as number;
+    const source = new EventSource(`http://localhost:8001/api/simulation/${simId}/stream`);
+    source.onmessage = (event) => {
+      applySimulationUpdate(JSON.parse(event.data));
+    };
+    source.onerror = (error) => {
+      console.error('Simulation stream error:', error);
+    };
     
-    setPollingInterval(interval);
+    eventSource.current = source;
   };
 
-  const fetchSimulationUpdate = async (simId: string) => {
-    // Don't make API calls if simulation is paused
+  const applySimulationUpdate = async (data: any) => {
+    // Ignore pushed updates while the simulation is paused
     if (isSimulationPaused) {
-      console.log('Simulation is paused, skipping API call');
+      console.log('Simulation is paused, skipping update');
       return;
     }
     
     try {
-      const response = await fetch(`http://localhost:8001/api/simulation/${simId}/state`);
-      
-      if (response.ok) {
-        const data = await response.json();
+      // Update the census data with new simulation values
+      if (data.tiles) {
+        const tiles: TileColumns = data.tiles;
+        console.log('Received tiles data:', tiles.geoid.length, 'tiles');
         
-        // Update the census data with new simulation values
-        if (data.tiles) {
-          console.log('Received tiles data:', data.tiles.length, 'tiles');
-          console.log('Sample tile data:', data.tiles[0]);
-          
-          const updatedCensusData = { ...allCensusData };
-          
-          data.tiles.forEach((tile: TileData) => {
-            if (updatedCensusData[tile.geoid]) {
-              updatedCensusData[tile.geoid] = {
-                ...updatedCensusData[tile.geoid],
-                infectious_pop: tile.amount_infected,
-                deceased_pop: tile.amount_deceased,
-                susceptible_pop: tile.total_population - tile.amount_infected - tile.amount_deceased,
-              };
-              
-              // Log if this tile has infections
-              if (tile.amount_infected > 0) {
-                console.log('Found infected tile:', tile.geoid, 'infections:', tile.amount_infected, 'total:', tile.total_population);
-              }
+        // Events after the first only carry the tiles that changed (data.since is set)
+        const updatedCensusData = { ...latestCensusData.current };
+        
+        tiles.geoid.forEach((geoid, i) => {
+          if (updatedCensusData[geoid]) {
+            const amountInfected = tiles.amount_infected[i];
+            const amountDeceased = tiles.amount_deceased[i];
+            updatedCensusData[geoid] = {
+              ...updatedCensusData[geoid],
+              infectious_pop: amountInfected,
+              deceased_pop: amountDeceased,
+              susceptible_pop: tiles.total_population[i] - amountInfected - amountDeceased,
+            };
+            
+            // Log if this tile has infections
+            if (amountInfected > 0) {
+              console.log('Found infected tile:', geoid, 'infections:', amountInfected, 'total:', tiles.total_population[i]);
             }
-          });
-          
-          setAllCensusData(updatedCensusData);
-          filterDataByZoom(updatedCensusData, currentZoom);
-          
-          // Update selected tile data if it's currently selected
-          if (selectedTile && updatedCensusData[selectedTile]) {
-            setSelectedTileData(updatedCensusData[selectedTile]);
           }
-          
-          // Update map data source for real-time visualization
-          updateMapDataSource(updatedCensusData);
-        }
+        });
         
-        // Also fetch updated statistics
-        const stats = await apiService.getStatistics();
-        if (stats) {
-          setStatistics(stats);
-        }
+        latestCensusData.current = updatedCensusData;
+        setAllCensusData(updatedCensusData);
+        filterDataByZoom(updatedCensusData, currentZoom);
         
-        // If simulation is stopped, stop polling but keep the current state visible
-        if (data.status === 'stopped') {
-          console.log('Simulation completed - stopping updates but keeping final visible state');
-          stopPolling();
-          setIsSimulationRunning(false);
-          // Don't reset the data - keep showing the progression that occurred
+        // Update selected tile data if it's currently selected
+        if (selectedTile && updatedCensusData[selectedTile]) {
+          setSelectedTileData(updatedCensusData[selectedTile]);
         }
+        
+        // Update map data source for real-time visualization
+        updateMapDataSource(updatedCensusData);
+      }
+      
+      // Also fetch updated statistics
+      const stats = await apiService.getStatistics();
+      if (stats) {
+        setStatistics(stats);
+      }
+      
+      // If simulation is stopped, stop polling but keep the current state visible
+      if (data.status === 'stopped') {
+        console.log('Simulation completed - stopping updates but keeping final visible state');
+        stopPolling();
+        setIsSimulationRunning(false);
+        // Don't reset the data - keep showing the progression that occurred
       }
     } catch (error) {
-      console.error('Failed to fetch simulation update:', error);
+      console.error('Failed to apply simulation update:', error);
     }
   };
 
   const stopPolling = () => {
-    if (pollingInterval) {
-      clearInterval(pollingInterval);
-      setPollingInterval(null);
+    if (eventSource.current) {
+      eventSource.current.close();
+      eventSource.current = null;
     }
   };
 
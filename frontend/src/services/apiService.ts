@@ -10,6 +10,24 @@ export interface TileData {
   coordinates?: [number, number];
 }
 
+// Tile payloads are sent column-wise: one array per field, aligned by index
+export interface TileColumns {
+  geoid: string[];
+  total_population: number[];
+  amount_infected: number[];
+  amount_deceased: number[];
+  coordinates: [number, number][];
+}
+
+export const tilesFromColumns = (columns: TileColumns): TileData[] =>
+  columns.geoid.map((geoid, i) => ({
+    geoid,
+    total_population: columns.total_population[i],
+    amount_infected: columns.amount_infected[i],
+    amount_deceased: columns.amount_deceased[i],
+    coordinates: columns.coordinates[i],
+  }));
+
 export interface SimulationParams {
   infection_rate: number;
   mortality_rate: number;
@@ -52,7 +70,7 @@ class ApiService {
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
-      return await response.json();
+      return tilesFromColumns(await response.json());
     } catch (error) {
       console.warn('Failed to fetch tiles from backend, using sample data:', error);
       // Return sample data as fallback
@@ -122,7 +140,8 @@ class ApiService {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
       
-      return await response.json();
+      const data = await response.json();
+      return { ...data, tiles: tilesFromColumns(data.tiles) };
     } catch (error) {
       console.warn('Failed to get simulation state from backend:', error);
       return {
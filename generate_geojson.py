@@ -5,94 +5,116 @@ This script creates a GeoJSON file that includes polygon geometries for mapping.
 """
 
 import os
-import json
+import orjson
 import geopandas as gpd
 import pandas as pd
 from pathlib import Path
 
+# Tract properties copied from the simulation graph, with the value used for tracts
+# missing from it (None: filled separately below)
+TRACT_PROPERTIES = {
+    "population": 0,
+    "population_density": 0,
+    "area_km2": 0,
+    "susceptible_pop": None,
+    "infectious_pop": 0,
+    "recovered_pop": 0,
+    "deceased_pop": 0,
+    "healthcare_capacity": 0,
+    "is_quarantined": False,
+    "mobility_factor": 1.0,
+    "climate_factor": 1.0,
+    "neighbors": None,
+}
+
+# Boundary simplification tolerance in degrees (about 50 m at the equator);
+# invisible at typical map zoom levels but shrinks the output several-fold
+SIMPLIFY_TOLERANCE = 0.0005
+
+# Set GEOJSON_PRETTY=1 to indent each feature for debugging; output is minified otherwise
+DUMP_OPTIONS = orjson.OPT_INDENT_2 if os.environ.get("GEOJSON_PRETTY") == "1" else 0
+
+# Counts and flags turn into floats/objects when the left join leaves gaps; restore them
+TRACT_DTYPES = {
+    "population": "int64",
+    "susceptible_pop": "int64",
+    "infectious_pop": "int64",
+    "recovered_pop": "int64",
+    "deceased_pop": "int64",
+    "healthcare_capacity": "int64",
+    "is_quarantined": "bool",
+}
+
 def generate_tract_geojson():
     """Generate GeoJSON with tract boundaries and simulation data."""
     
-    # Check if the shapefile exists
-    shp_dir = "cb_2023_us_tract_500k"
-    shp_file = os.path.join(shp_dir, "cb_2023_us_tract_500k.shp")
+    # Check if the downloaded boundary zip exists; the shapefile is read from inside it
+    zip_file = "cb_2023_us_tract_500k.zip"
+    shp_file = f"/vsizip/{zip_file}/cb_2023_us_tract_500k.shp"
     
-    if not os.path.exists(shp_file):
-        print(f"Shapefile not found at {shp_file}")
+    if not os.path.exists(zip_file):
+        print(f"Shapefile archive not found at {zip_file}")
         print("Please run the main data loading script first to download census boundaries.")
         return None
     
     print("Loading census tract shapefile...")
     
     # Load the shapefile with geometries
-    gdf = gpd.read_file(shp_file)
+    gdf = gpd.read_file(shp_file, engine="pyogrio")
     
-    # Ensure WGS84 projection for web mapping
-    gdf = gdf.to_crs(4326)
+    # Ensure WGS84 projection for web mapping; reprojecting is skipped when the
+    # source is already in it
+    if gdf.crs is None or gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(4326)
     
     # Load the existing simulation data
     graph_file = "us_census_graph.json"
     if os.path.exists(graph_file):
         print("Loading simulation data...")
-        with open(graph_file, 'r') as f:
-            simulation_data = json.load(f)
+        with open(graph_file, 'rb') as f:
+            simulation_data = orjson.loads(f.read())
     else:
         print("No simulation data found, using default values")
         simulation_data = {}
     
-    # Create features list for GeoJSON
-    features = []
-    
     print(f"Processing {len(gdf)} census tracts...")
     
-    for _, row in gdf.iterrows():
-        geoid = row['GEOID']
-        
-        # Get simulation data for this tract
-        sim_data = simulation_data.get(geoid, {})
-        
-        # Create feature with geometry and properties
-        feature = {
-            "type": "Feature",
-            "properties": {
-                "geoid": geoid,
-                "population": sim_data.get("population", 0),
-                "population_density": sim_data.get("population_density", 0),
-                "area_km2": sim_data.get("area_km2", 0),
-                "susceptible_pop": sim_data.get("susceptible_pop", sim_data.get("population", 0)),
-                "infectious_pop": sim_data.get("infectious_pop", 0),
-                "recovered_pop": sim_data.get("recovered_pop", 0),
-                "deceased_pop": sim_data.get("deceased_pop", 0),
-                "healthcare_capacity": sim_data.get("healthcare_capacity", 0),
-                "is_quarantined": sim_data.get("is_quarantined", False),
-                "mobility_factor": sim_data.get("mobility_factor", 1.0),
-                "climate_factor": sim_data.get("climate_factor", 1.0),
-                "neighbors": sim_data.get("neighbors", [])
-            },
-            "geometry": row['geometry'].__geo_interface__
-        }
-        
-        features.append(feature)
-        
-        # Limit for performance testing (remove this for full dataset)
-        if len(features) >= 5000:
-            print(f"Limited to first {len(features)} tracts for performance")
-            break
+    # Limit for performance testing (remove this for full dataset)
+    if len(gdf) > 5000:
+        gdf = gdf.iloc[:5000].copy()
+        print(f"Limited to first {len(gdf)} tracts for performance")
+    
+    gdf['geometry'] = gdf.geometry.simplify(SIMPLIFY_TOLERANCE, preserve_topology=True)
+    
+    # Join the simulation data onto the tracts as columns rather than looking it up row by row
+    sim_df = pd.DataFrame.from_dict(simulation_data, orient='index')
+    sim_df = sim_df.reindex(columns=list(TRACT_PROPERTIES))
+    tracts = gdf[['GEOID', 'geometry']].rename(columns={'GEOID': 'geoid'})
+    tracts = tracts.merge(sim_df, left_on='geoid', right_index=True, how='left')
     
-    # Create GeoJSON structure
-    geojson = {
-        "type": "FeatureCollection",
-        "features": features
-    }
+    # Tracts without simulation data get the defaults; susceptible defaults to the whole population
+    tracts = tracts.fillna({key: value for key, value in TRACT_PROPERTIES.items() if value is not None})
+    tracts['susceptible_pop'] = tracts['susceptible_pop'].fillna(tracts['population'])
+    tracts['neighbors'] = [value if isinstance(value, list) else [] for value in tracts['neighbors']]
+    tracts = tracts.astype(TRACT_DTYPES)
     
-    # Save GeoJSON file
+    # Save GeoJSON file, streaming one feature at a time so the whole
+    # FeatureCollection is never held in memory
     output_file = "us_census_tracts.geojson"
     print(f"Saving GeoJSON to {output_file}...")
     
-    with open(output_file, 'w') as f:
-        json.dump(geojson, f, indent=2)
+    feature_count = 0
+    with open(output_file, 'wb') as f:
+        f.write(b'{"type":"FeatureCollection","features":[')
+        # Columns become feature properties, in the order above
+        for feature in tracts.iterfeatures(drop_id=True):
+            if feature_count:
+                f.write(b',')
+            f.write(orjson.dumps(feature, option=DUMP_OPTIONS))
+            feature_count += 1
+        f.write(b']}')
     
-    print(f"Generated GeoJSON with {len(features)} census tracts")
+    print(f"Generated GeoJSON with {feature_count} census tracts")
     print(f"File size: {os.path.getsize(output_file) / 1024 / 1024:.1f} MB")
     
     return output_file
@@ -6,9 +6,14 @@ This modifies the existing us_census_graph.json to include actual polygon bounda
 
 import json
 import os
+import orjson
+import shapely
 import geopandas as gpd
+from itertools import islice
 from pathlib import Path
 
+SAMPLE_NODES = 10000
+
 def load_existing_graph():
     """Load the existing census graph data."""
     try:
@@ -20,30 +25,46 @@ def load_existing_graph():
 
 def load_tract_geometries():
     """Load census tract geometries from the shapefile."""
-    shp_path = os.path.join("cb_2023_us_tract_500k", "cb_2023_us_tract_500k.shp")
+    zip_path = "cb_2023_us_tract_500k.zip"
+    shp_path = f"/vsizip/{zip_path}/cb_2023_us_tract_500k.shp"
     
-    if not os.path.exists(shp_path):
-        print(f"Shapefile not found at {shp_path}")
+    if not os.path.exists(zip_path):
+        print(f"Shapefile archive not found at {zip_path}")
         print("Please run the data loading script first to download the shapefile.")
         return None
     
     print("Loading census tract geometries...")
-    gdf = gpd.read_file(shp_path)
+    gdf = gpd.read_file(shp_path, engine="pyogrio")
     
-    # Ensure WGS84 projection for web mapping
-    gdf = gdf.to_crs(4326)
+    # Ensure WGS84 projection for web mapping; reprojecting is skipped when the
+    # source is already in it
+    if gdf.crs is None or gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(4326)
     
-    # Create a dict mapping GEOID to geometry
-    geometries = {}
-    for _, row in gdf.iterrows():
-        geoid = row['GEOID']
-        # Convert geometry to GeoJSON format
-        geometry = row['geometry'].__geo_interface__
-        geometries[geoid] = geometry
+    # Create a dict mapping GEOID to geometry. All geometries are converted to
+    # GeoJSON in one vectorized call, and kept as pre-serialized fragments that
+    # orjson writes out verbatim instead of parsing them back into dicts.
+    geometry_json = shapely.to_geojson(gdf.geometry.values)
+    geometries = dict(zip(gdf['GEOID'], map(orjson.Fragment, geometry_json)))
     
     print(f"Loaded geometries for {len(geometries)} census tracts")
     return geometries
 
+def write_graph(path, items, option=0):
+    """
+    Write (GEOID, node) pairs as one JSON object, serializing a single record
+    at a time so the output is never buffered in memory as a whole.
+    """
+    with open(path, 'wb') as f:
+        f.write(b'{')
+        for i, (geoid, node_data) in enumerate(items):
+            if i:
+                f.write(b',\n' if option & orjson.OPT_INDENT_2 else b',')
+            f.write(orjson.dumps(geoid))
+            f.write(b':')
+            f.write(orjson.dumps(node_data, option=option | orjson.OPT_SERIALIZE_NUMPY))
+        f.write(b'}')
+
 def main():
     # Load existing graph data
     graph_data = load_existing_graph()
@@ -67,24 +88,19 @@ def main():
     
     # Write the updated graph data
     output_file = 'us_census_graph_with_geometry.json'
-    with open(output_file, 'w') as f:
-        json.dump(graph_data, f, indent=2)
+    write_graph(output_file, graph_data.items())
     
     print(f"Updated {updated_count} nodes with geometry data")
     print(f"Wrote updated graph to {output_file}")
     
-    # Also create a smaller sample for testing (first 10k nodes)
-    sample_data = {}
-    for i, (geoid, node_data) in enumerate(graph_data.items()):
-        if i >= 10000:
-            break
-        sample_data[geoid] = node_data
-    
+    # Also create a smaller sample for testing (first 10k nodes), streamed straight
+    # from the in-memory graph rather than copied into a second dict first
+    sample_size = min(SAMPLE_NODES, len(graph_data))
     sample_file = 'us_census_graph_sample_10k.json'
-    with open(sample_file, 'w') as f:
-        json.dump(sample_data, f, indent=2)
+    # The sample is meant for inspection, so each record stays pretty-printed
+    write_graph(sample_file, islice(graph_data.items(), sample_size), option=orjson.OPT_INDENT_2)
     
-    print(f"Also created sample with {len(sample_data)} nodes: {sample_file}")
+    print(f"Also created sample with {sample_size} nodes: {sample_file}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -24,8 +24,6 @@ def run_simulation():
         print("Please run the 'sim/scripts/load_data.py' script first to generate these files.")
         return
 
-    total_population = sum(node.population for node in nodes.values())
-
     # 2. Initialize Simulation
     sim = Simulation(
         nodes=nodes,
@@ -33,6 +31,7 @@ def run_simulation():
         recovery_rate=RECOVERY_RATE,
         mortality_rate=MORTALITY_RATE,
     )
+    total_population = int(sim.population.sum())
     sim.seed_infection(num_nodes=SEED_NODES)
     print(f"Seeded infection in {SEED_NODES} nodes.")
 
@@ -46,11 +45,17 @@ def run_simulation():
     ax_new_infected = fig.add_subplot(gs[1, 1])
 
     # Extract node positions and initial colors
-    node_ids = list(nodes.keys())
-    positions = np.array([[-nodes[nid].lon, nodes[nid].lat] for nid in node_ids]) # -lon for correct map orientation
+    # Row i of the simulation arrays is node_ids[i], so positions line up with sim.I
+    positions = np.column_stack((-sim.lon, sim.lat)) # -lon for correct map orientation
     
-    scatter = ax_map.scatter(positions[:, 0], positions[:, 1], s=5, c='blue')
-    title = ax_map.set_title(f"Day: 0 | Preparing...", fontsize=14)
+    # RGBA colors indexed by "has infections": 0 -> blue, 1 -> red
+    palette = np.array([[0, 0, 1, 1], [1, 0, 0, 1]], dtype=np.float32)
+    # Pixel markers with no edges are stamped directly by Agg, far cheaper than stroked circles.
+    # Offsets are set once here; update() only ever changes face colors.
+    scatter = ax_map.scatter(positions[:, 0], positions[:, 1], s=1, marker=',', edgecolors='none', c=palette[:1])
+    # Drawn inside the map axes: blitting only restores the background within an axes' bounds
+    title = ax_map.text(0.5, 0.98, f"Day: 0 | Preparing...", transform=ax_map.transAxes,
+                        ha='center', va='top', fontsize=14)
     ax_map.set_xlabel("Longitude")
     ax_map.set_ylabel("Latitude")
 
@@ -81,10 +86,15 @@ def run_simulation():
     plt.tight_layout(rect=[0, 0, 1, 0.96])
 
 
+    def init():
+        """Initial frame for blitting: the animated artists as set up above."""
+        return scatter, line_total, line_new, title
+
     def update(frame):
         """Animation update function called for each frame (day)."""
         # --- Update Line Graphs ---
-        stats_after = sim.get_total_population()
+        # Running totals are kept by the simulation; no need to re-sum the state arrays
+        stats_after = sim.totals
         current_total_infected = stats_after['infectious']
         
         # Calculate new infections for the day
@@ -100,28 +110,36 @@ def run_simulation():
 
         # Update total infected plot
         line_total.set_data(history_days, history_total_infected)
-        # Dynamically adjust y-axis
+        # Dynamically adjust y-axis, only when the ceiling is crossed
+        rescaled = False
         if current_total_infected > ax_total_infected.get_ylim()[1]:
             ax_total_infected.set_ylim(0, current_total_infected * 1.2)
+            rescaled = True
 
         # Update new infections plot
         line_new.set_data(history_days, history_new_infections)
         if new_infections_today > ax_new_infected.get_ylim()[1]:
             ax_new_infected.set_ylim(0, new_infections_today * 1.2)
+            rescaled = True
+
+        if rescaled:
+            # New tick labels need one full redraw; the blit background is re-captured from it
+            fig.canvas.draw()
 
         # --- Update Map and Title ---
-        colors = ['red' if sim.nodes[nid].infectious_pop > 0 else 'blue' for nid in node_ids]
-        scatter.set_color(colors)
+        mask = (sim.I > 0).astype(np.uint8)
+        scatter.set_facecolors(palette[mask])
 
-        infected_nodes_count = sum(1 for node in sim.nodes.values() if node.infectious_pop > 0)
+        infected_nodes_count = int(np.count_nonzero(mask))
         title.set_text(
             f"Day: {sim.day} | Infected Nodes: {infected_nodes_count:,} | Total Infected: {stats_after['infectious']:,} | Recovered: {stats_after['recovered']:,} | Deceased: {stats_after['deceased']:,}"
         )
 
-        # No return needed when blit=False
+        return scatter, line_total, line_new, title
 
     # 4. Run Animation
-    ani = animation.FuncAnimation(fig, update, frames=SIM_DAYS, blit=False, interval=1, repeat=False)
+    # Blitting redraws only the animated artists each frame instead of the whole figure
+    ani = animation.FuncAnimation(fig, update, frames=SIM_DAYS, init_func=init, blit=True, interval=1, repeat=False)
     
     plt.show()
 
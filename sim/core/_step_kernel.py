@@ -0,0 +1,100 @@
+"""
+Numba-compiled simulation step.
+
+step_kernel is None when numba is not installed; Simulation then falls back
+to its vectorized NumPy step.
+"""
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange
+except ImportError:  # numba is optional
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def step_kernel(S, I, R, D, population, density_factor, nbr_indptr, nbr_indices,
+                    infection_rate, recovery_rate, mortality_rate,
+                    newly_infected, newly_recovered, newly_deceased, neighbor_infected):
+        """
+        Compiled equivalent of Simulation._step_python: same two-level model,
+        operating in place on the state arrays and CSR neighbor arrays.
+        newly_* (length n) and neighbor_infected (n_chunks x n) are caller-owned
+        scratch buffers, cleared here, so a step allocates nothing.
+        Nodes are split into one contiguous chunk per neighbor_infected row; neighbor
+        infections are accumulated into that chunk's own row, so the parallel scatter
+        needs no atomics. Random draws use numba's per-thread generator state.
+        Returns (new infections, recoveries, deaths, infected node count).
+        """
+        n = S.shape[0]
+        n_chunks = neighbor_infected.shape[0]
+        chunk_size = (n + n_chunks - 1) // n_chunks
+
+        for c in prange(n_chunks):
+            local_infected = neighbor_infected[c]
+            local_infected[:] = 0
+            for i in range(c * chunk_size, min(n, (c + 1) * chunk_size)):
+                newly_infected[i] = 0
+                newly_recovered[i] = 0
+                newly_deceased[i] = 0
+                node_infectious = I[i]
+                if node_infectious == 0:
+                    continue
+                node_population = population[i]
+                node_susceptible = S[i]
+
+                # --- 1. Intra-node spread ---
+                potential = 0.0
+                if node_population > 0:
+                    potential = (infection_rate * density_factor[i] *
+                                 node_susceptible * node_infectious) / node_population
+                if 0.0 < potential < 1.0:
+                    new_intra = 1
+                else:
+                    new_intra = int(np.rint(potential))
+                newly_infected[i] = min(node_susceptible, new_intra)
+
+                # --- 2. Inter-node spread ---
+                infection_pressure = 0.0
+                if node_population > 0:
+                    infection_pressure = node_infectious / node_population
+                per_event = max(1, int(np.rint(infection_pressure * 5)))
+                for e in range(nbr_indptr[i], nbr_indptr[i + 1]):
+                    target = nbr_indices[e]
+                    if S[target] > 0 and np.random.random() < infection_pressure:
+                        local_infected[target] += per_event
+
+                # --- Recoveries and deaths ---
+                new_recoveries = min(node_infectious, int(np.rint(node_infectious * recovery_rate)))
+                new_deaths = min(node_infectious - new_recoveries, int(np.rint(node_infectious * mortality_rate)))
+                newly_recovered[i] = new_recoveries
+                newly_deceased[i] = new_deaths
+
+        # --- 3. Combine the per-thread buffers and apply all changes simultaneously ---
+        day_infections = 0
+        day_recoveries = 0
+        day_deaths = 0
+        infected_nodes = 0
+        for i in prange(n):
+            incoming = 0
+            for c in range(n_chunks):
+                incoming += neighbor_infected[c, i]
+            total_new_infections = min(S[i], newly_infected[i] + incoming)
+            S[i] -= total_new_infections
+            I[i] += total_new_infections - newly_recovered[i] - newly_deceased[i]
+            R[i] += newly_recovered[i]
+            D[i] += newly_deceased[i]
+            day_infections += total_new_infections
+            day_recoveries += newly_recovered[i]
+            day_deaths += newly_deceased[i]
+            if I[i] > 0:
+                infected_nodes += 1
+        return day_infections, day_recoveries, day_deaths, infected_nodes
+
+    def kernel_chunks():
+        """Number of neighbor_infected rows to give step_kernel: one per numba thread."""
+        return get_num_threads()
+else:
+    step_kernel = None
+    kernel_chunks = None
@@ -3,10 +3,11 @@
 from __future__ import annotations
 from dataclasses import dataclass, field, asdict
 from typing import Dict, List, Optional
-import csv
 import json
+import numpy as np
+import pandas as pd
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     """
     Pandemic-simulation node representing a single Census tract.
@@ -14,6 +15,7 @@ class Node:
     Designed to match the outputs of the data fetching script:
       - tract_nodes.csv: GEOID, lon, lat, population, area_km2, density_per_km2
       - tract_neighbors.json: { GEOID: [neighbor GEOIDs] }
+      - tract_neighbors.npz: the same lists as CSR arrays (geoids, indptr, indices)
 
     Geometry polygons are NOT required here; adjacency comes from precomputed neighbors.
     """
@@ -108,38 +110,129 @@ class Node:
         return 2 * R * asin(min(1.0, sqrt(a)))
 
 
+class NodeView:
+    """
+    Live view of a Node whose SIR compartments are owned by a simulation's arrays.
+
+    `state` is any object exposing parallel arrays S, I, R, D and quarantined
+    (e.g. Simulation); `idx` is this node's row in them. Compartment reads and
+    writes go straight to those arrays, everything else is read from the
+    wrapped Node, so existing `node.infectious_pop` call sites keep working.
+    """
+    __slots__ = ("_node", "_state", "_idx")
+
+    def __init__(self, node: Node, state, idx: int):
+        self._node = node
+        self._state = state
+        self._idx = idx
+
+    def _compartment(array_name: str):
+        def fget(self):
+            return getattr(self._state, array_name)[self._idx].item()
+
+        def fset(self, value):
+            getattr(self._state, array_name)[self._idx] = value
+
+        return property(fget, fset)
+
+    susceptible_pop = _compartment("S")
+    infectious_pop = _compartment("I")
+    recovered_pop = _compartment("R")
+    deceased_pop = _compartment("D")
+    is_quarantined = _compartment("quarantined")
+    del _compartment
+
+    def __getattr__(self, name):
+        return getattr(self._node, name)
+
+    def to_dict(self) -> Dict:
+        d = self._node.to_dict()
+        for key in ("susceptible_pop", "infectious_pop", "recovered_pop", "deceased_pop", "is_quarantined"):
+            d[key] = getattr(self, key)
+        return d
+
+
 # -------- Graph assembly helpers (plug-and-play with your fetcher outputs) --------
 
 def load_nodes_from_csv(nodes_csv_path: str) -> Dict[str, Node]:
     """
     Load all nodes from tract_nodes.csv and return a dict { GEOID: Node }.
+    Columns are parsed by pandas with explicit dtypes; Nodes are then built from the
+    typed columns, matching Node.from_csv_row field for field.
     """
+    df = pd.read_csv(
+        nodes_csv_path,
+        dtype={"GEOID": str, "lon": "float64", "lat": "float64", "population": "float64",
+               "area_km2": "float64", "density_per_km2": "float64", "median_income": "float64"},
+        float_precision="round_trip",  # parse floats exactly as float() would
+    )
+    population = df["population"].to_numpy().astype(np.int64)  # handles "123.0"
+    median_income = df["median_income"] if "median_income" in df else np.zeros(len(df))  # Default to 0 if missing
+    healthcare_capacity = np.maximum(1, np.rint(population * 0.001)).astype(np.int64)  # ~1 bed per 1,000 people
+
     nodes: Dict[str, Node] = {}
-    with open(nodes_csv_path, newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            node = Node.from_csv_row(row)
-            nodes[node.id] = node
+    for geoid, lon, lat, pop, area_km2, density, income, capacity in zip(
+        df["GEOID"].tolist(), df["lon"].tolist(), df["lat"].tolist(), population.tolist(),
+        df["area_km2"].tolist(), df["density_per_km2"].tolist(), np.asarray(median_income).tolist(),
+        healthcare_capacity.tolist(),
+    ):
+        nodes[geoid] = Node(
+            id=geoid,
+            lon=lon,
+            lat=lat,
+            population=pop,
+            area_km2=area_km2,
+            population_density=density,
+            median_income=income,
+            susceptible_pop=pop,
+            healthcare_capacity=capacity,
+        )
     return nodes
 
 
 def attach_neighbors_from_json(nodes: Dict[str, Node], neighbors_json_path: str) -> None:
     """
     Attach neighbor lists from tract_neighbors.json into existing Node objects.
+    Lists are attached as-is; Simulation drops self-loops and duplicates in bulk
+    when it builds its CSR neighbor arrays.
     """
     with open(neighbors_json_path, "r") as f:
         nbrs = json.load(f)
     for geoid, adj in nbrs.items():
-        if geoid in nodes:
-            nodes[geoid].set_neighbors(adj)
+        node = nodes.get(geoid)
+        if node is not None:
+            node.neighbors = adj
+
+
+def attach_neighbors_from_npz(nodes: Dict[str, Node], neighbors_npz_path: str) -> None:
+    """
+    Attach neighbor lists from tract_neighbors.npz into existing Node objects.
+    The file holds CSR arrays: the neighbors of geoids[i] are
+    geoids[indices[indptr[i]:indptr[i + 1]]], so no JSON text is parsed.
+    """
+    with np.load(neighbors_npz_path) as data:
+        geoids = data["geoids"].tolist()
+        bounds = data["indptr"].tolist()
+        indices = data["indices"]
+    # Gathering from an object array reuses one str per GEOID across all neighbor lists
+    targets = np.array(geoids, dtype=object)[indices].tolist()
+    for i, geoid in enumerate(geoids):
+        node = nodes.get(geoid)
+        if node is not None:
+            node.neighbors = targets[bounds[i]:bounds[i + 1]]
 
 
 def load_graph(nodes_csv_path: str, neighbors_json_path: str) -> Dict[str, Node]:
     """
     Convenience one-liner: load nodes and neighbors together.
+    Neighbors are read from tract_neighbors.json, or from tract_neighbors.npz
+    when given a .npz path.
     Usage:
         nodes = load_graph("tract_nodes.csv", "tract_neighbors.json")
     """
     nodes = load_nodes_from_csv(nodes_csv_path)
-    attach_neighbors_from_json(nodes, neighbors_json_path)
+    if neighbors_json_path.endswith(".npz"):
+        attach_neighbors_from_npz(nodes, neighbors_json_path)
+    else:
+        attach_neighbors_from_json(nodes, neighbors_json_path)
     return nodes
\ No newline at end of file
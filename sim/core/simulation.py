@@ -1,103 +1,242 @@
-import random
-from typing import Dict, List
-from sim.core.entities import Node
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sim.core.entities import Node, NodeView
+from sim.core._step_kernel import kernel_chunks, step_kernel
+
 
 class Simulation:
-    def __init__(self, nodes: Dict[str, Node], infection_rate: float, recovery_rate: float, mortality_rate: float):
-        self.nodes = nodes
+    def __init__(self, nodes: Dict[str, Node], infection_rate: float, recovery_rate: float, mortality_rate: float,
+                 seed: Optional[int] = None):
         self.infection_rate = infection_rate
         self.recovery_rate = recovery_rate
         self.mortality_rate = mortality_rate
         self.day = 0
+        self.daily_new_infections = 0
+
+        # Node state is stored column-wise: row i of every array belongs to node_ids[i].
+        # Counts fit in int32 and coordinates/densities in float32, which halves the
+        # memory traffic of every step compared to the 64-bit defaults.
+        # Other components (e.g. the API server) can share these arrays directly.
+        self.node_ids: List[str] = list(nodes)
+        self.geoid_to_idx: Dict[str, int] = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        node_list = list(nodes.values())
+        n = len(node_list)
+        self.lon = np.fromiter((node.lon for node in node_list), dtype=np.float32, count=n)
+        self.lat = np.fromiter((node.lat for node in node_list), dtype=np.float32, count=n)
+        self.population = np.fromiter((node.population for node in node_list), dtype=np.int32, count=n)
+        self.density = np.fromiter((node.population_density for node in node_list), dtype=np.float32, count=n)
+        # Intra-node growth multiplier; density never changes during a run, so it is computed once.
+        # A simple approach: scale density to be a multiplier.
+        self.density_factor = (self.density.astype(np.float64) / 1000) + 1 # Simple scaling
+        self.S = np.fromiter((node.susceptible_pop for node in node_list), dtype=np.int32, count=n)
+        self.I = np.fromiter((node.infectious_pop for node in node_list), dtype=np.int32, count=n)
+        self.R = np.fromiter((node.recovered_pop for node in node_list), dtype=np.int32, count=n)
+        self.D = np.fromiter((node.deceased_pop for node in node_list), dtype=np.int32, count=n)
+        self.quarantined = np.fromiter((node.is_quarantined for node in node_list), dtype=np.bool_, count=n)
+
+        # Neighbor graph in CSR form: the neighbors of node i are
+        # nbr_indices[nbr_indptr[i]:nbr_indptr[i + 1]].
+        # Edges are gathered flat, then self-loops, unknown GEOIDs and duplicates are
+        # dropped in one vectorized pass; np.unique on the (source, target) key also
+        # sorts the edges by source, which is exactly CSR order.
+        listed_degrees = np.fromiter((len(node.neighbors) for node in node_list), dtype=np.int64, count=n)
+        src = np.repeat(np.arange(n, dtype=np.int64), listed_degrees)
+        dst = np.fromiter(
+            (self.geoid_to_idx.get(nb, -1) for node in node_list for nb in node.neighbors),
+            dtype=np.int64, count=int(listed_degrees.sum()),
+        )
+        keep = (dst >= 0) & (dst != src)
+        edge_keys = np.unique(src[keep] * n + dst[keep])
+        self.nbr_indices = (edge_keys % n).astype(np.int32)
+        self.nbr_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_keys // n, minlength=n), out=self.nbr_indptr[1:])
+        # The graph never changes, so per-node degrees are computed once here
+        self.degree = np.diff(self.nbr_indptr)
+
+        # One PCG64 generator for every random draw; per-edge draws are written into a
+        # preallocated buffer sized for the whole edge list so a step allocates nothing for them.
+        self.rng = np.random.default_rng(seed)
+        self._edge_rand = np.empty(len(self.nbr_indices), dtype=np.float32)
+        # Per-step change buffers, reused every day by whichever step path runs;
+        # the compiled kernel also needs one neighbor-infection row per thread
+        self._new_infected = np.zeros(n, dtype=np.int32)
+        self._new_recovered = np.zeros(n, dtype=np.int32)
+        self._new_deceased = np.zeros(n, dtype=np.int32)
+        if step_kernel is not None:
+            self._neighbor_infected = np.zeros((kernel_chunks(), n), dtype=np.int32)
+
+        # Callers keep a {GEOID: node} mapping; each entry is a live view onto the arrays above.
+        self.nodes: Dict[str, NodeView] = {
+            node_id: NodeView(node, self, i) for i, (node_id, node) in enumerate(nodes.items())
+        }
+
+        # Running compartment totals, updated incrementally by seeding and step()
+        # so callers can read aggregate statistics without walking every node.
+        self.totals = {
+            "population": int(self.population.sum()),
+            "susceptible": int(self.S.sum()),
+            "infectious": int(self.I.sum()),
+            "recovered": int(self.R.sum()),
+            "deceased": int(self.D.sum()),
+            "infected_nodes": int(np.count_nonzero(self.I)),
+        }
 
     def seed_infection(self, num_nodes: int = 1):
         """Randomly infects a number of nodes to start the simulation."""
-        infected_nodes = random.sample(list(self.nodes.keys()), num_nodes)
-        for node_id in infected_nodes:
-            node = self.nodes[node_id]
-            node.susceptible_pop -= 1
-            node.infectious_pop += 1
+        idx = self.rng.choice(len(self.node_ids), size=num_nodes, replace=False)
+        # One case per chosen node, skipping nodes with nobody left to infect
+        count = np.minimum(self.S[idx], 1)
+        self.totals["infected_nodes"] += int(np.count_nonzero((self.I[idx] == 0) & (count > 0)))
+        self.S[idx] -= count
+        self.I[idx] += count
+        seeded = int(count.sum())
+        self.totals["susceptible"] -= seeded
+        self.totals["infectious"] += seeded
+
+    def seed_infection_at(self, node_id: str, count: int) -> int:
+        """Moves up to `count` susceptible people in a node to infectious; returns the number moved."""
+        i = self.geoid_to_idx[node_id]
+        count = min(count, int(self.S[i]))
+        if count <= 0:
+            return 0
+        if self.I[i] == 0:
+            self.totals["infected_nodes"] += 1
+        self.S[i] -= count
+        self.I[i] += count
+        self.totals["susceptible"] -= count
+        self.totals["infectious"] += count
+        return count
 
     def step(self):
         """
         Advances the simulation by one day based on a two-level infection model.
         1. Intra-node spread: Exponential growth within a node, scaled by density.
         2. Inter-node spread: Probabilistic spread to neighbors based on infection pressure.
+        Uses the numba-compiled kernel when numba is installed.
         """
-        # Store changes to apply at the end of the step to avoid cascading effects
-        newly_infected_counts = {node_id: 0 for node_id in self.nodes}
-        newly_recovered_counts = {node_id: 0 for node_id in self.nodes}
-        newly_deceased_counts = {node_id: 0 for node_id in self.nodes}
-
-        for node_id, node in self.nodes.items():
-            if node.infectious_pop == 0:
-                continue
-
-            # --- 1. Intra-node spread (within the tract) ---
-            # Growth factor is influenced by density.
-            # A simple approach: scale density to be a multiplier.
-            density_factor = (node.population_density / 1000) + 1 # Simple scaling
-
-            # Calculate potential new infections within this node based on SIR model
-            potential_intra_node_infections = (
-                self.infection_rate * density_factor *
-                node.susceptible_pop * node.infectious_pop
-            ) / node.population if node.population > 0 else 0
-            
-            # --- FIX: Ensure infection grows from a single case ---
-            # If there's any potential, infect at least one person, otherwise use the calculated value.
-            if 0 < potential_intra_node_infections < 1:
-                new_intra_node_infections = 1
-            else:
-                new_intra_node_infections = int(round(potential_intra_node_infections))
-            
-            new_intra_node_infections = min(node.susceptible_pop, new_intra_node_infections)
-            if new_intra_node_infections > 0:
-                newly_infected_counts[node_id] += new_intra_node_infections
-
-            # --- 2. Inter-node spread (to neighbors) ---
-            # Infection pressure is the percentage of the node's population that is infectious
-            infection_pressure = node.infectious_pop / node.population if node.population > 0 else 0
-            
-            # Attempt to infect each neighbor
-            for neighbor_id in node.neighbors:
-                neighbor_node = self.nodes.get(neighbor_id)
-                if neighbor_node and neighbor_node.susceptible_pop > 0:
-                    # The chance of spread is proportional to the source's infection pressure
-                    if random.random() < infection_pressure:
-                        # If successful, infect a small number of people in the neighbor node,
-                        # proportional to the source's pressure.
-                        # Let's say up to 5 people can be infected this way per event.
-                        new_infections_in_neighbor = max(1, int(round(infection_pressure * 5)))
-                        newly_infected_counts[neighbor_id] += new_infections_in_neighbor
-
-            # --- SIR model: Recoveries and Deaths ---
-            new_recoveries = int(round(node.infectious_pop * self.recovery_rate))
-            new_deaths = int(round(node.infectious_pop * self.mortality_rate))
-            
-            # Ensure we don't recover/decease more people than are infectious
-            new_recoveries = min(node.infectious_pop, new_recoveries)
-            new_deaths = min(node.infectious_pop - new_recoveries, new_deaths)
-
-            newly_recovered_counts[node_id] = new_recoveries
-            newly_deceased_counts[node_id] = new_deaths
+        if step_kernel is not None:
+            day_infections, day_recoveries, day_deaths, infected_nodes = step_kernel(
+                self.S, self.I, self.R, self.D, self.population, self.density_factor,
+                self.nbr_indptr, self.nbr_indices,
+                self.infection_rate, self.recovery_rate, self.mortality_rate,
+                self._new_infected, self._new_recovered, self._new_deceased, self._neighbor_infected,
+            )
+        else:
+            day_infections, day_recoveries, day_deaths, infected_nodes = self._step_python()
 
-        # --- 3. Apply all calculated changes simultaneously ---
-        for node_id, node in self.nodes.items():
-            # Clamp new infections to the available susceptible population
-            total_new_infections = min(node.susceptible_pop, newly_infected_counts[node_id])
-            
-            node.susceptible_pop -= total_new_infections
-            node.infectious_pop += total_new_infections
-            
-            # Apply recoveries and deaths
-            recoveries_and_deaths = newly_recovered_counts[node_id] + newly_deceased_counts[node_id]
-            node.infectious_pop -= recoveries_and_deaths
-            node.recovered_pop += newly_recovered_counts[node_id]
-            node.deceased_pop += newly_deceased_counts[node_id]
+        self.totals["susceptible"] -= day_infections
+        self.totals["infectious"] += day_infections - day_recoveries - day_deaths
+        self.totals["recovered"] += day_recoveries
+        self.totals["deceased"] += day_deaths
+        self.totals["infected_nodes"] = infected_nodes
+        self.daily_new_infections = day_infections
 
         self.day += 1
 
+    def _step_python(self) -> Tuple[int, int, int, int]:
+        """
+        Vectorized NumPy step used when numba is unavailable; mutates the state arrays in place.
+        Returns (new infections, recoveries, deaths, infected node count).
+        """
+        n = len(self.node_ids)
+        # Store changes to apply at the end of the step to avoid cascading effects;
+        # the buffers are owned by the simulation and only cleared between steps
+        newly_infected_counts = self._new_infected
+        newly_recovered_counts = self._new_recovered
+        newly_deceased_counts = self._new_deceased
+        newly_infected_counts.fill(0)
+        newly_recovered_counts.fill(0)
+        newly_deceased_counts.fill(0)
+
+        # Only nodes with infectious people can spread, recover or die, and early
+        # in an outbreak they are a tiny fraction; work on their rows alone
+        active = np.flatnonzero(self.I)
+        node_population = np.maximum(self.population[active], 1)
+        node_susceptible = self.S[active]
+        node_infectious = self.I[active]
+
+        # --- 1. Intra-node spread (within each tract) ---
+        # Growth factor is influenced by density.
+        density_factor = self.density_factor[active]
+
+        # Calculate potential new infections within each node based on SIR model
+        potential_intra_node_infections = (
+            self.infection_rate * density_factor * node_susceptible * node_infectious
+        ) / node_population
+
+        # --- FIX: Ensure infection grows from a single case ---
+        # If there's any potential, infect at least one person, otherwise use the calculated value.
+        new_intra_node_infections = np.where(
+            (potential_intra_node_infections > 0) & (potential_intra_node_infections < 1),
+            1,
+            np.rint(potential_intra_node_infections).astype(np.int32),
+        )
+        newly_infected_counts[active] = np.minimum(node_susceptible, new_intra_node_infections)
+
+        # --- 2. Inter-node spread (to neighbors) ---
+        # Infection pressure is the percentage of each node's population that is infectious
+        infection_pressure = node_infectious / node_population
+
+        # Each edge fires independently with the source's pressure, so the number of
+        # firing edges of a source is Binomial(degree, pressure): one draw per source
+        starts = self.nbr_indptr[active]
+        counts = self.degree[active]
+        fired = self.rng.binomial(counts, infection_pressure)
+
+        # For the few sources that fired, pick which of their edges fired: shuffle each
+        # source's edges by a random key and keep the first `fired` of them
+        firing = np.flatnonzero(fired)
+        firing_counts = counts[firing]
+        offsets = np.repeat(np.cumsum(firing_counts) - firing_counts, firing_counts)
+        edges = np.arange(len(offsets)) - offsets + np.repeat(starts[firing], firing_counts)
+        group = np.repeat(np.arange(len(firing)), firing_counts)
+        edge_rand = self._edge_rand[:len(edges)]
+        self.rng.random(out=edge_rand, dtype=np.float32)
+        order = np.argsort(group + edge_rand)  # random keys in [0, 1) never cross groups
+        chosen = (np.arange(len(order)) - offsets) < np.repeat(fired[firing], firing_counts)
+        targets = self.nbr_indices[edges[order][chosen]]
+        edge_pressure = infection_pressure[firing][group[order][chosen]]
+
+        # Only susceptible neighbors can be infected
+        hit = self.S[targets] > 0
+
+        # Each successful event infects a small number of people in the neighbor node,
+        # proportional to the source's pressure (up to 5 per event)
+        new_infections_in_neighbor = np.maximum(1, np.rint(edge_pressure[hit] * 5).astype(np.int32))
+        # bincount is a single buffered pass, unlike the unbuffered np.add.at scatter
+        newly_infected_counts += np.bincount(
+            targets[hit], weights=new_infections_in_neighbor, minlength=n
+        ).astype(np.int32)
+
+        # --- SIR model: Recoveries and Deaths ---
+        # Ensure we don't recover/decease more people than are infectious
+        new_recoveries = np.minimum(node_infectious, np.rint(node_infectious * self.recovery_rate).astype(np.int32))
+        new_deaths = np.minimum(
+            node_infectious - new_recoveries, np.rint(node_infectious * self.mortality_rate).astype(np.int32)
+        )
+        newly_recovered_counts[active] = new_recoveries
+        newly_deceased_counts[active] = new_deaths
+
+        # --- 3. Apply all calculated changes simultaneously ---
+        # Only active nodes and their infected neighbors change, so the state arrays are
+        # updated in one pass over just those rows rather than four passes over every node
+        rows = np.union1d(active, targets[hit])
+        recovered = newly_recovered_counts[rows]
+        deceased = newly_deceased_counts[rows]
+        # Clamp new infections to the available susceptible population
+        total_new_infections = np.minimum(self.S[rows], newly_infected_counts[rows])
+        self.S[rows] -= total_new_infections
+        self.I[rows] += total_new_infections - recovered - deceased
+        self.R[rows] += recovered
+        self.D[rows] += deceased
+
+        return (
+            int(total_new_infections.sum()),
+            int(new_recoveries.sum()),
+            int(new_deaths.sum()),
+            int(np.count_nonzero(self.I)),
+        )
+
     def run(self, days: int):
         """Runs the simulation for a given number of days."""
         for _ in range(days):
@@ -105,13 +244,9 @@ class Simulation:
 
     def get_total_population(self):
         """Returns the total population statistics."""
-        total_susceptible = sum(node.susceptible_pop for node in self.nodes.values())
-        total_infectious = sum(node.infectious_pop for node in self.nodes.values())
-        total_recovered = sum(node.recovered_pop for node in self.nodes.values())
-        total_deceased = sum(node.deceased_pop for node in self.nodes.values())
         return {
-            "susceptible": total_susceptible,
-            "infectious": total_infectious,
-            "recovered": total_recovered,
-            "deceased": total_deceased,
+            "susceptible": int(self.S.sum()),
+            "infectious": int(self.I.sum()),
+            "recovered": int(self.R.sum()),
+            "deceased": int(self.D.sum()),
         }
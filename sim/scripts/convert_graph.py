@@ -0,0 +1,50 @@
+import os
+import orjson
+import numpy as np
+
+def convert_graph(json_path, npz_path=None):
+    """
+    Convert a graph JSON ({GEOID: node}) into an uncompressed .npz of flat arrays:
+    geoids, lon, lat, population, population_density and the neighbor graph in CSR
+    form (the neighbors of node i are nbr_indices[nbr_indptr[i]:nbr_indptr[i + 1]]).
+    np.load reads each array straight from the file on demand, with no JSON parsing.
+    """
+    if npz_path is None:
+        npz_path = os.path.splitext(json_path)[0] + ".npz"
+
+    print(f"Loading {json_path}...")
+    with open(json_path, 'rb') as f:
+        graph = orjson.loads(f.read())
+
+    geoids = list(graph)
+    records = list(graph.values())
+    n = len(records)
+    index = {geoid: i for i, geoid in enumerate(geoids)}
+
+    # Neighbors missing from the graph are dropped, as the simulation does
+    neighbor_rows = [[index[nb] for nb in record.get('neighbors', []) if nb in index] for record in records]
+    nbr_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in neighbor_rows], out=nbr_indptr[1:])
+    nbr_indices = np.fromiter((j for row in neighbor_rows for j in row), dtype=np.int32, count=int(nbr_indptr[-1]))
+
+    np.savez(
+        npz_path,
+        geoids=np.array(geoids, dtype=str),
+        lon=np.fromiter((record['lon'] for record in records), dtype=np.float64, count=n),
+        lat=np.fromiter((record['lat'] for record in records), dtype=np.float64, count=n),
+        population=np.fromiter((record.get('population', 0) for record in records), dtype=np.int32, count=n),
+        population_density=np.fromiter((record.get('population_density', 0) for record in records),
+                                        dtype=np.float32, count=n),
+        nbr_indptr=nbr_indptr,
+        nbr_indices=nbr_indices,
+    )
+    print(f"Wrote {n} nodes and {len(nbr_indices)} neighbor links to {npz_path}")
+    return npz_path
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python convert_graph.py <path_to_graph_json> [output.npz]")
+        sys.exit(1)
+
+    convert_graph(*sys.argv[1:])
@@ -1,25 +1,57 @@
-import json
+import os
 import random
+from functools import lru_cache
+import numpy as np
+import orjson
 import matplotlib.pyplot as plt
 
+@lru_cache(maxsize=4)
+def _load_graph(filepath, mtime):
+    """
+    Parse a graph JSON file with orjson. Cached per (path, modification time), so
+    repeated visualizations of an unchanged file skip the parse entirely.
+    """
+    with open(filepath, 'rb') as f:
+        return orjson.loads(f.read())
+
+@lru_cache(maxsize=4)
+def _load_graph_npz(filepath, mtime):
+    """Load the arrays of a graph .npz written by convert_graph.py, cached like _load_graph."""
+    with np.load(filepath) as npz:
+        return {key: npz[key] for key in ('geoids', 'lon', 'lat', 'nbr_indptr', 'nbr_indices')}
+
 def visualize_random_node_and_neighbors(filepath):
     """
     Picks a random node from the graph and plots it along with its neighbors.
+    Accepts the graph JSON or the .npz produced from it by convert_graph.py.
     """
-    with open(filepath, 'r') as f:
-        graph = json.load(f)
+    if filepath.endswith('.npz'):
+        graph = _load_graph_npz(filepath, os.path.getmtime(filepath))
+        indptr, indices = graph['nbr_indptr'], graph['nbr_indices']
+
+        # 1. Pick a random node that has at least a few neighbors
+        idx = random.choice(np.flatnonzero(np.diff(indptr) > 2))
+        random_node_id = graph['geoids'][idx]
+        neighbor_idx = indices[indptr[idx]:indptr[idx + 1]]
+
+        # 2. Extract coordinates for plotting
+        central_lon, central_lat = graph['lon'][idx], graph['lat'][idx]
+        neighbor_lons = graph['lon'][neighbor_idx]
+        neighbor_lats = graph['lat'][neighbor_idx]
+    else:
+        graph = _load_graph(filepath, os.path.getmtime(filepath))
 
-    # 1. Pick a random node that has at least a few neighbors
-    random_node_id = random.choice([k for k,v in graph.items() if len(v['neighbors']) > 2])
-    central_node = graph[random_node_id]
+        # 1. Pick a random node that has at least a few neighbors
+        random_node_id = random.choice([k for k,v in graph.items() if len(v['neighbors']) > 2])
+        central_node = graph[random_node_id]
 
-    neighbor_ids = central_node['neighbors']
-    neighbor_nodes = [graph[nid] for nid in neighbor_ids if nid in graph]
+        neighbor_ids = central_node['neighbors']
+        neighbor_nodes = [graph[nid] for nid in neighbor_ids if nid in graph]
 
-    # 2. Extract coordinates for plotting
-    central_lon, central_lat = central_node['lon'], central_node['lat']
-    neighbor_lons = [n['lon'] for n in neighbor_nodes]
-    neighbor_lats = [n['lat'] for n in neighbor_nodes]
+        # 2. Extract coordinates for plotting
+        central_lon, central_lat = central_node['lon'], central_node['lat']
+        neighbor_lons = [n['lon'] for n in neighbor_nodes]
+        neighbor_lats = [n['lat'] for n in neighbor_nodes]
 
     # 3. Plot the results
     plt.figure(figsize=(10, 8))
@@ -38,7 +70,7 @@ def visualize_random_node_and_neighbors(filepath):
 if __name__ == "__main__":
     import sys
     if len(sys.argv) != 2:
-        print("Usage: python data_vis.py <path_to_graph_json>")
+        print("Usage: python data_vis.py <path_to_graph_json_or_npz>")
         sys.exit(1)
 
     graph_path = sys.argv[1]
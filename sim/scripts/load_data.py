@@ -1,16 +1,21 @@
 import io
 import os
-import json
-import zipfile
+import asyncio
+from itertools import compress
+import aiohttp
 import requests
 import pandas as pd
 import geopandas as gpd
+import numpy as np
+import orjson
+import shapely
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 from shapely.geometry import Point
-from libpysal.weights import Queen
 from tqdm import tqdm
 
 # NEW: import the Node and helpers
-from sim.core.entities import Node, load_nodes_from_csv, attach_neighbors_from_json  # adjust import if needed
+from sim.core.entities import Node, load_nodes_from_csv, attach_neighbors_from_npz  # adjust import if needed
 
 # ---- Insecure HTTP session (no TLS verification) ----
 import urllib3
@@ -25,6 +30,8 @@ def get_insecure_session() -> requests.Session:
     s.headers.update({
         "User-Agent": "cura-pandemic-sim/1.0 (+local)",
         "Accept": "*/*",
+        # ACS responses are JSON of numeric strings and compress several-fold
+        "Accept-Encoding": "gzip, deflate",
     })
     retries = Retry(
         total=5,
@@ -34,8 +41,10 @@ def get_insecure_session() -> requests.Session:
         raise_on_status=False,
         respect_retry_after_header=True,
     )
-    s.mount("http://", HTTPAdapter(max_retries=retries))
-    s.mount("https://", HTTPAdapter(max_retries=retries))
+    # One adapter per scheme, with a pool large enough that requests for every state reuse open connections
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=32, pool_maxsize=32)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
     return s
 
 SESSION = get_insecure_session()
@@ -47,6 +56,8 @@ SESSION = get_insecure_session()
 CB_ZIP_URL = "http://www2.census.gov/geo/tiger/GENZ2023/shp/cb_2023_us_tract_500k.zip"  # Cartographic Boundary tracts (nationwide)
 CB_ZIP_PATH = "cb_2023_us_tract_500k.zip"
 CB_SHP_BASENAME = "cb_2023_us_tract_500k.shp"
+# GDAL reads the shapefile straight out of the downloaded zip, with no extraction step
+CB_SHP_PATH = f"/vsizip/{CB_ZIP_PATH}/{CB_SHP_BASENAME}"
 
 # ACS 5-year dataset + variables for total population and median income
 ACS_YEAR = 2023
@@ -56,9 +67,14 @@ ACS_INCOME_VAR = "B19013_001E"  # Median household income in past 12 months
 
 # Optional: set CENSUS_API_KEY in your env for higher rate limits
 CENSUS_API_KEY = os.getenv("CENSUS_API_KEY", None)
+# States fetched at once, and retries per state on throttling/server errors
+ACS_CONCURRENCY = 12
+ACS_RETRIES = 5
 
 OUT_NODES_CSV = "tract_nodes.csv"
 OUT_NEIGHBORS_JSON = "tract_neighbors.json"
+# the same neighbor lists as CSR arrays (geoids, indptr, indices), for fast reloading
+OUT_NEIGHBORS_NPZ = "tract_neighbors.npz"
 # full graph JSON (nodes with neighbors & SIR fields)
 OUT_GRAPH_JSON = "us_census_graph.json"
 
@@ -85,107 +101,191 @@ def download_cartographic_boundary():
                 f.write(chunk)
     print("Download complete.")
 
-def extract_zip():
-    with zipfile.ZipFile(CB_ZIP_PATH, 'r') as z:
-        z.extractall("cb_2023_us_tract_500k")
-
 def load_tracts() -> gpd.GeoDataFrame:
-    shp_path = os.path.join("cb_2023_us_tract_500k", CB_SHP_BASENAME)
-    gdf = gpd.read_file(shp_path)
+    # pyogrio streams the file through GDAL's Arrow interface in batches, and only
+    # the GEOID attribute column is read alongside the geometry
+    gdf = gpd.read_file(CB_SHP_PATH, engine="pyogrio", use_arrow=True, columns=["GEOID"])
     # Ensure expected fields: GEOID present in CB files
     assert "GEOID" in gdf.columns, "GEOID not found in shapefile."
-    # Reproject to WGS84 for lon/lat output
-    gdf = gdf.to_crs(4326)
-    # Compute lon/lat via geometric centroids (ok for approx)
-    gdf["lon"] = gdf.geometry.centroid.x
-    gdf["lat"] = gdf.geometry.centroid.y
-    # For area/density, use an equal-area CRS (World Cylindrical Equal Area EPSG:6933)
-    equal_area = gdf.to_crs(6933)
-    gdf["area_km2"] = equal_area.geometry.area / 1_000_000.0
+    # CB tracts are NAD83 lon/lat, which matches WGS84 coordinate for coordinate, so the
+    # polygons are kept as read; only a projected source needs its polygons reprojected
+    if not gdf.crs.is_geographic:
+        gdf = gdf.to_crs(4326)
+    # Compute lon/lat via geometric centroids (ok for approx), computed once for all tracts;
+    # only the centroid points are reprojected to WGS84, not the polygons
+    centroids = gpd.GeoSeries(shapely.centroid(gdf.geometry.to_numpy()), crs=gdf.crs).to_crs(4326)
+    gdf["lon"] = shapely.get_x(centroids.to_numpy())
+    gdf["lat"] = shapely.get_y(centroids.to_numpy())
+    # For area/density, use an equal-area CRS (World Cylindrical Equal Area EPSG:6933);
+    # this is the only reprojection of the polygons
+    gdf["area_km2"] = shapely.area(gdf.geometry.to_crs(6933).to_numpy()) / 1_000_000.0
     return gdf[["GEOID","lon","lat","area_km2","geometry"]]
 
-def fetch_acs_data_for_state(state_fips: str) -> pd.DataFrame:
-    """
-    Returns a DataFrame with columns: GEOID, population, median_income
-    Query: by county:* and tract:* within state
-    """
+def acs_query(state_fips: str) -> str:
+    """ACS query URL for every tract in a state (by county:* and tract:*)."""
     # Build URL manually to control repeated 'in' params
     query = f"{ACS_DATASET}?get=NAME,{ACS_POP_VAR},{ACS_INCOME_VAR}&for=tract:*&in=state:{state_fips}&in=county:*"
     if CENSUS_API_KEY:
         query += f"&key={CENSUS_API_KEY}"
+    return query
 
-    r = SESSION.get(query, timeout=60)
-    r.raise_for_status()
-    rows = r.json()
+def acs_rows_to_frame(rows: list) -> pd.DataFrame:
+    """
+    Turn an ACS JSON response (header row + data rows) into a DataFrame with
+    columns: GEOID, population, median_income
+    """
     header, data = rows[0], rows[1:]
     df = pd.DataFrame(data, columns=header)
     # GEOID = state(2) + county(3) + tract(6)
     df["GEOID"] = df["state"] + df["county"] + df["tract"]
-    df["population"] = pd.to_numeric(df[ACS_POP_VAR], errors="coerce")
-    df["median_income"] = pd.to_numeric(df[ACS_INCOME_VAR], errors="coerce")
+    # Always float64 (a state with no missing values would otherwise parse as int64),
+    # so every state's frame has the same dtypes and concatenating them needs no casts
+    df["population"] = pd.to_numeric(df[ACS_POP_VAR], errors="coerce").astype(np.float64)
+    df["median_income"] = pd.to_numeric(df[ACS_INCOME_VAR], errors="coerce").astype(np.float64)
     return df[["GEOID","population","median_income"]]
 
+def fetch_acs_data_for_state(state_fips: str) -> pd.DataFrame:
+    """
+    Returns a DataFrame with columns: GEOID, population, median_income
+    Query: by county:* and tract:* within state
+    """
+    r = SESSION.get(acs_query(state_fips), timeout=60)
+    r.raise_for_status()
+    return acs_rows_to_frame(orjson.loads(r.content))
+
+async def _fetch_acs_state(session: aiohttp.ClientSession, sem: asyncio.Semaphore, state_fips: str):
+    """Fetch one state's ACS rows; returns (state_fips, rows or the exception raised)."""
+    async with sem:
+        try:
+            # Retry throttling and server errors with backoff, like SESSION's Retry policy
+            for attempt in range(ACS_RETRIES + 1):
+                async with session.get(acs_query(state_fips)) as r:
+                    if r.status in (429, 500, 502, 503, 504) and attempt < ACS_RETRIES:
+                        await asyncio.sleep(0.5 * 2 ** attempt)
+                        continue
+                    r.raise_for_status()
+                    return state_fips, orjson.loads(await r.read())
+        except Exception as e:
+            return state_fips, e
+
+async def _fetch_acs_all(states: list) -> dict:
+    """Fetch every state concurrently over one connection pool; returns {state_fips: rows or exception}."""
+    sem = asyncio.Semaphore(ACS_CONCURRENCY)
+    # no TLS verification, as SESSION; the one api.census.gov lookup is cached for the whole run
+    connector = aiohttp.TCPConnector(ssl=False, limit=ACS_CONCURRENCY, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=60)
+    # Responses are gzip-encoded and decompressed by aiohttp (auto_decompress)
+    headers = {key: SESSION.headers[key] for key in ("User-Agent", "Accept", "Accept-Encoding")}
+    results = {}
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers,
+                                     auto_decompress=True) as session:
+        tasks = [_fetch_acs_state(session, sem, s) for s in states]
+        for done in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="ACS data (population + income)"):
+            state_fips, result = await done
+            results[state_fips] = result
+    return results
+
 def fetch_acs_data_all_states() -> pd.DataFrame:
+    results = asyncio.run(_fetch_acs_all(STATE_FIPS))
     frames = []
-    for s in tqdm(STATE_FIPS, desc="ACS data (population + income)"):
+    for s in STATE_FIPS:
         try:
-            frames.append(fetch_acs_data_for_state(s))
+            if isinstance(results[s], Exception):
+                raise results[s]
+            frames.append(acs_rows_to_frame(results[s]))
         except Exception as e:
             print(f"[WARN] ACS fetch failed for state {s}: {e}")
-    data = pd.concat(frames, ignore_index=True).drop_duplicates(subset=["GEOID"])
+    data = pd.concat(frames, ignore_index=True, copy=False).drop_duplicates(subset=["GEOID"], ignore_index=True)
     return data
 
 def build_queen_neighbors(gdf: gpd.GeoDataFrame) -> dict:
     """
     Build Queen contiguity neighbors: polygons sharing an edge OR a vertex.
+    Sharing an edge implies sharing its end vertices, so it is enough to find
+    polygons with a vertex at exactly the same coordinates. All vertices are
+    extracted in one vectorized call and matched by sorting, with no
+    per-polygon geometry work (unlike an STRtree "touches" query, which runs a
+    full GEOS relate for every candidate pair).
     Returns dict GEOID -> [neighbor GEOIDs]
     """
-    print("Building Queen contiguity (this can take a few minutes)...")
-    W = Queen.from_dataframe(gdf.set_index("GEOID"))
-    neighbors = {k: v for k, v in W.neighbors.items()}
-    # keys are positional indices; map back to GEOIDs
-    gdf_ordered = gdf.set_index("GEOID")
-    index_map = {i: geoid for i, geoid in enumerate(gdf_ordered.index)}
-    geoid_neighbors = {index_map[i]: [index_map[j] for j in nbrs] for i, nbrs in neighbors.items()}
-    return geoid_neighbors
-
-def find_largest_connected_component(nodes: list, neighbors: dict) -> set:
+    print("Building Queen contiguity from shared vertices...")
+    geoms = gdf.geometry.values
+    n = len(geoms)
+    coords = shapely.get_coordinates(geoms)
+    owner = np.repeat(np.arange(n, dtype=np.int64), shapely.get_num_coordinates(geoms))
+
+    # Number each distinct vertex, then keep one (vertex, polygon) entry per polygon;
+    # the sorted keys group the polygons touching each vertex together
+    # Each (x, y) pair is viewed as one complex number, so vertices are sorted as flat scalars
+    # rather than as rows, which np.unique(axis=0) compares field by field
+    _, vertex = np.unique(coords.view(np.complex128).ravel(), return_inverse=True)
+    keys = np.unique(vertex.ravel() * n + owner)
+    vertex, owner = keys // n, keys % n
+
+    # Pair every polygon with every other polygon at the same vertex
+    starts = np.flatnonzero(np.r_[True, vertex[1:] != vertex[:-1]])
+    sizes = np.diff(np.r_[starts, len(vertex)])
+    shared = sizes > 1
+    group_start = np.repeat(starts[shared], sizes[shared])
+    group_size = np.repeat(sizes[shared], sizes[shared])
+    left = np.flatnonzero(np.repeat(shared, sizes))
+    offsets = np.arange(group_size.sum()) - np.repeat(np.cumsum(group_size) - group_size, group_size)
+    src = np.repeat(owner[left], group_size)
+    dst = owner[np.repeat(group_start, group_size) + offsets]
+    edges = np.unique(src[src != dst] * n + dst[src != dst])
+
+    # Split the sorted edge list into one neighbor list per polygon, islands included
+    geoids = gdf["GEOID"].to_numpy()
+    indptr = np.searchsorted(edges // n, np.arange(n + 1))
+    targets = geoids[edges % n]
+    return {geoids[i]: targets[indptr[i]:indptr[i + 1]].tolist() for i in range(n)}
+
+def write_neighbors_npz(path: str, neighbors: dict) -> None:
+    """
+    Save neighbor lists in CSR form: the neighbors of geoids[i] are
+    geoids[indices[indptr[i]:indptr[i + 1]]]. Every neighbor must itself be a key.
+    """
+    geoids = list(neighbors)
+    index = {geoid: i for i, geoid in enumerate(geoids)}
+    indptr = np.zeros(len(geoids) + 1, dtype=np.int64)
+    np.cumsum([len(nbrs) for nbrs in neighbors.values()], out=indptr[1:])
+    indices = np.fromiter((index[nb] for nbrs in neighbors.values() for nb in nbrs),
+                          dtype=np.int32, count=int(indptr[-1]))
+    np.savez_compressed(path, geoids=np.array(geoids, dtype=str), indptr=indptr, indices=indices)
+
+def find_largest_connected_component(nodes: list, neighbors: dict) -> np.ndarray:
     """
     Finds the largest connected component in a graph.
-    Returns a set of the GEOIDs in that component.
+    GEOIDs are mapped to integer indices once and the graph handed to scipy's
+    connected_components as a CSR matrix.
+    Returns a boolean mask aligned with `nodes`, True for the GEOIDs in that component.
     """
-    visited = set()
-    components = []
-    for node in nodes:
-        if node not in visited:
-            component = set()
-            q = [node]
-            visited.add(node)
-            head = 0
-            while head < len(q):
-                curr = q[head]
-                head += 1
-                component.add(curr)
-                for neighbor in neighbors.get(curr, []):
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        q.append(neighbor)
-            components.append(component)
-    
-    if not components:
-        return set()
+    if not nodes:
+        return np.zeros(0, dtype=bool)
 
-    # Return the largest component
-    return max(components, key=len)
+    index = {geoid: i for i, geoid in enumerate(nodes)}
+    rows = [[index[nb] for nb in neighbors.get(geoid, []) if nb in index] for geoid in nodes]
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    indices = np.fromiter((j for row in rows for j in row), dtype=np.int32, count=int(indptr[-1]))
+    graph = csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(len(nodes), len(nodes)))
+
+    _, labels = connected_components(graph, directed=False)
+    # Labels are numbered from the first node, so ties go to the earliest component, as before
+    largest = np.bincount(labels).argmax()
+    return labels == largest
 
 def main():
     download_cartographic_boundary()
-    extract_zip()
 
     tracts = load_tracts()  # GEOID, lon, lat, area_km2, geometry
 
     acs_data = fetch_acs_data_all_states()  # GEOID, population, median_income
-    g = tracts.merge(acs_data, on="GEOID", how="left")
+    # GEOID is unique on both sides; validate says so (and fails loudly if it is not)
+    g = tracts.merge(acs_data, on="GEOID", how="left", validate="one_to_one", sort=False)
+
+    # The merged frame holds everything needed from here on
+    del tracts, acs_data
 
     # compute density (pop per km^2). If missing pop, set to 0/NaN -> 0
     g["population"] = g["population"].fillna(0)
@@ -199,50 +299,63 @@ def main():
     # --- NEW: Filter to the largest connected component to remove islands ---
     print("Finding largest connected component to remove islands...")
     all_node_ids = list(g["GEOID"])
-    largest_component_ids = find_largest_connected_component(all_node_ids, neighbors)
+    in_largest = find_largest_connected_component(all_node_ids, neighbors)
     
-    # Filter the GeoDataFrame and neighbors dict
-    g = g[g["GEOID"].isin(largest_component_ids)].copy()
+    # Filter the GeoDataFrame and neighbors dict by the mask, which is aligned with g's
+    # rows, so no GEOID is hashed again (g is only read from here on, so no copy)
+    g = g.loc[in_largest]
     
-    filtered_neighbors = {}
-    for geoid, nbrs in neighbors.items():
-        if geoid in largest_component_ids:
-            # Keep only neighbors that are also in the main component
-            filtered_neighbors[geoid] = [n for n in nbrs if n in largest_component_ids]
-    
-    neighbors = filtered_neighbors
+    # A connected component contains every neighbor of its members, so the kept
+    # neighbor lists need no per-element filtering
+    neighbors = {geoid: neighbors[geoid] for geoid in compress(all_node_ids, in_largest)}
     print(f"Filtered graph to {len(g)} nodes in the largest component.")
     # --- END NEW SECTION ---
 
     # write nodes table (kept for debug/inspection)
-    g[["GEOID","lon","lat","population","area_km2","density_per_km2","median_income"]].to_csv(OUT_NODES_CSV, index=False)
-    with open(OUT_NEIGHBORS_JSON, "w") as f:
-        json.dump(neighbors, f)
+    # Counts are written as integers and floats with 6 decimals (~0.1 m of lon/lat), which
+    # roughly halves the file and the parsing done by load_nodes_from_csv below
+    nodes_table = g[["GEOID","lon","lat","population","area_km2","density_per_km2","median_income"]].astype(
+        {"population": np.int32, "median_income": np.int32}
+    )
+    nodes_table.to_csv(OUT_NODES_CSV, index=False, float_format="%.6f")
+    with open(OUT_NEIGHBORS_JSON, "wb") as f:
+        f.write(orjson.dumps(neighbors))
+    write_neighbors_npz(OUT_NEIGHBORS_NPZ, neighbors)
+
+    # Only the GEOIDs and geometries are needed from here on, as GeoJSON text; the
+    # frame and the neighbor dict are released before the graph JSON is built.
+    # All geometries are converted to GeoJSON text in one vectorized GEOS call
+    geometry_json = dict(zip(g["GEOID"].to_numpy(), shapely.to_geojson(g.geometry.to_numpy())))
+    del g, neighbors
 
     # ----- build Node objects and emit a single graph JSON -----
     print("Assembling Node graph JSON with geometry...")
     nodes = load_nodes_from_csv(OUT_NODES_CSV)
-    attach_neighbors_from_json(nodes, OUT_NEIGHBORS_JSON)
+    attach_neighbors_from_npz(nodes, OUT_NEIGHBORS_NPZ)
 
-    # Add geometry data to each node's extras field
+    # Each node is serialized and written on its own, with its polygon geometry added
+    # to its extras field, so only one node's geometry is held as objects at a time.
+    # Nested records are re-indented to match a single OPT_INDENT_2 dump of the whole graph.
     print("Adding polygon geometry to nodes...")
     geometry_count = 0
-    for _, row in g.iterrows():
-        geoid = row["GEOID"]
-        if geoid in nodes:
-            # Convert geometry to GeoJSON format and store in extras
-            geometry_geojson = row["geometry"].__geo_interface__
-            nodes[geoid].extras = nodes[geoid].extras or {}
-            nodes[geoid].extras["geometry"] = geometry_geojson
-            geometry_count += 1
+    option = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+    with open(OUT_GRAPH_JSON, "wb") as f:
+        f.write(b"{")
+        for i, (geoid, node) in enumerate(nodes.items()):
+            record = node.to_dict()
+            geometry = geometry_json.pop(geoid, None)
+            if geometry is not None:
+                # Store the GeoJSON geometry in extras
+                record["extras"] = record["extras"] or {}
+                record["extras"]["geometry"] = orjson.loads(geometry)
+                geometry_count += 1
+            f.write(b",\n  " if i else b"\n  ")
+            f.write(orjson.dumps(geoid) + b": " + orjson.dumps(record, option=option).replace(b"\n", b"\n  "))
+        f.write(b"\n}" if nodes else b"}")
     
     print(f"Added geometry to {geometry_count} nodes")
 
-    serializable_graph = {geoid: node.to_dict() for geoid, node in nodes.items()}
-    with open(OUT_GRAPH_JSON, "w") as f:
-        json.dump(serializable_graph, f, indent=2)
-
-    print(f"\nWrote {OUT_NODES_CSV}, {OUT_NEIGHBORS_JSON}, and {OUT_GRAPH_JSON}")
+    print(f"\nWrote {OUT_NODES_CSV}, {OUT_NEIGHBORS_JSON}, {OUT_NEIGHBORS_NPZ}, and {OUT_GRAPH_JSON}")
     print("Nodes JSON keys: id, lon, lat, population, area_km2, population_density, neighbors, compartments, params...")
 
 if __name__ == "__main__":
@@ -1,14 +1,21 @@
-import json
+import orjson
 
 def run_health_check(filepath):
     print(f"Running health check on {filepath}...")
-    with open(filepath, 'r') as f:
-        graph = json.load(f)
+    with open(filepath, 'rb') as f:
+        graph = orjson.loads(f.read())
 
     errors = 0
-    all_ids = set(graph.keys())
+    # Neighbor lists as frozensets, so each symmetry check is a hash lookup rather than a list scan
+    nbr_sets = {node_id: frozenset(node_data.get('neighbors', [])) for node_id, node_data in graph.items()}
+    all_ids = nbr_sets.keys()
 
     for node_id, node_data in graph.items():
+        # Nodes whose neighbors all exist and all list them back need no further checks
+        nbrs = nbr_sets[node_id]
+        if nbrs <= all_ids and all(node_id in nbr_sets[neighbor_id] for neighbor_id in nbrs):
+            continue
+
         # Check for neighbor symmetry
         for neighbor_id in node_data.get('neighbors', []):
             if neighbor_id not in all_ids:
@@ -16,8 +23,7 @@ def run_health_check(filepath):
                 errors += 1
                 continue
 
-            neighbor_node = graph[neighbor_id]
-            if node_id not in neighbor_node.get('neighbors', []):
+            if node_id not in nbr_sets[neighbor_id]:
                 print(f"[ERROR] Asymmetry found! {node_id} -> {neighbor_id}, but not vice-versa.")
                 errors += 1
 
@@ -37,7 +37,7 @@ echo ""
 echo "✅ Setup complete!"
 echo ""
 echo "🚀 To start the application:"
-echo "1. Backend:  python ../api_server.py"
+echo "1. Backend:  cd .. && uvicorn api_server:app --port 8001 --workers 1 --loop uvloop"
 echo "2. Frontend: npm run dev"
 echo ""
 echo "Then open: http://localhost:5173"
\ No newline at end of file
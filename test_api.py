@@ -7,6 +7,7 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import traceback
 import json
+import numpy as np
 from sim.core.entities import load_graph
 from sim.core.simulation import Simulation
 
@@ -91,14 +92,16 @@ def get_simulation_stats():
     if not current_simulation:
         return {}
         
-    total_population = sum(node.population for node in current_simulation.nodes.values())
-    total_susceptible = sum(node.susceptible_pop for node in current_simulation.nodes.values())
-    total_infectious = sum(node.infectious_pop for node in current_simulation.nodes.values())
-    total_recovered = sum(node.recovered_pop for node in current_simulation.nodes.values())
-    total_deceased = sum(node.deceased_pop for node in current_simulation.nodes.values())
+    # The simulation keeps each compartment as one numpy array, so every total is a single C-level sum
+    sim = current_simulation
+    total_population = int(sim.population.sum(dtype=np.int64))
+    total_susceptible = int(sim.S.sum(dtype=np.int64))
+    total_infectious = int(sim.I.sum(dtype=np.int64))
+    total_recovered = int(sim.R.sum(dtype=np.int64))
+    total_deceased = int(sim.D.sum(dtype=np.int64))
     
     # Count infected areas
-    infected_areas = sum(1 for node in current_simulation.nodes.values() if node.infectious_pop > 0)
+    infected_areas = int(np.count_nonzero(sim.I))
     
     return {
         "day": current_simulation.day,